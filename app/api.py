@@ -1,15 +1,29 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query
 from pydantic import BaseModel
 from typing import Any, Dict, List, Optional
+import os
+import secrets
+import threading
+import time
 import pandas as pd
 
 from src.models.reranker_model import ReRankerModel
 from src.data.movie_repository import MovieRepository
 from src.models.embedding_model import EmbeddingModel
+from src.models.embedding_service import EmbeddingQueueFull, EmbeddingService
 from src.index.index_builder import IndexBuilder
 from src.recommender.recommendation_engine import RecommendationEngine
+from src.recommender.result_cache import RecommendationCache
+from src.recommender.pagination import CandidatePoolStore
 from src.chatbotservice.chatbot_service import ChatbotService
 from src.conversation.get_useful_info import get_useful_info
+from src.conversation.interpreter import set_title_index
+from src.monitoring.metrics import EMPTY_RESULTS, CallbackMetric, instrumented, timed
+from src.config.settings import (
+    EMBED_MICRO_BATCHING,
+    NEIGHBOUR_TABLE_K,
+    SNAPSHOT_WATCH_INTERVAL_S,
+)
 
 
 router = APIRouter()
@@ -24,49 +38,239 @@ class AppState:
         self.re_ranker = None
         self.recommender = None
         self.chatbot = None
+        self.snapshot_version = None
+        self.ready = False
 
  
 
 STATE = AppState()
+INIT_LOCK = threading.Lock()
+RELOAD_LOCK = threading.Lock()
+WARM_UP_TEXT = "a feel-good adventure movie"
 
-def ensure_initialized():
-    if STATE.recommender is not None:
-        return
-    
-    print("Initializing movie bot ..✅.")
+# Shared across snapshots; entries are tied to the engine's version
+RESULT_CACHE = RecommendationCache()
+CANDIDATE_POOLS = CandidatePoolStore()
+
+
+def load_recommender(
+    embedder: EmbeddingModel | EmbeddingService,
+    re_ranker: Optional[ReRankerModel] = None,
+    version: Optional[str] = None,
+) -> tuple[MovieRepository, RecommendationEngine, Optional[str]]:
+    """
+    Load catalog + index snapshot and build a RecommendationEngine.
+    """
     repo = MovieRepository()
     repo.load()
 
-    embedder = EmbeddingModel()
-    re_ranker = ReRankerModel()
     builder = IndexBuilder(repo, embedder)
-    faiss_index, mapping = builder.load_index()
+    version = version or builder.current_version()
+    faiss_index, mapping = builder.load_index(version=version)
 
-    recommmender = RecommendationEngine(
+    recommender = RecommendationEngine(
         repository=repo,
         embedding_model=embedder,
         faiss_index=faiss_index,
-        index_to_movie_id=mapping)
-    
-    chatbot = ChatbotService()
+        index_to_movie_id=mapping,
+        re_ranker=re_ranker,
+        result_cache=RESULT_CACHE,
+        version=version,
+        neighbours=builder.load_neighbours(version=version))
+
+    return repo, recommender, version
+
+
+def ensure_initialized():
+    """
+    Build and warm the app state once. Concurrent callers wait on the
+    lock instead of building their own engines.
+    """
+    if STATE.ready:
+        return
 
-    STATE.repo = repo
-    STATE.re_ranker = re_ranker
-    STATE.embedder = embedder
-    STATE.recommender = recommmender
-    STATE.chatbot = chatbot
+    with INIT_LOCK:
+        if STATE.ready:
+            return
+
+        print("Initializing movie bot ..✅.")
+        embedder = EmbeddingModel()
+        if EMBED_MICRO_BATCHING:
+            embedder = EmbeddingService(embedder)
+        re_ranker = ReRankerModel()
+        repo, recommmender, version = load_recommender(embedder, re_ranker)
+
+        chatbot = ChatbotService()
+        set_title_index(repo.title_index)
+
+        warm_up(embedder, re_ranker, recommmender)
+
+        STATE.repo = repo
+        STATE.re_ranker = re_ranker
+        STATE.embedder = embedder
+        STATE.recommender = recommmender
+        STATE.chatbot = chatbot
+        STATE.snapshot_version = version
+        STATE.ready = True
+
+        if SNAPSHOT_WATCH_INTERVAL_S > 0:
+            threading.Thread(target=watch_snapshots, daemon=True).start()
 
     print("Movie bot is ready! 🚀")
-    
 
 
+def warm_up(
+    embedder: EmbeddingModel | EmbeddingService,
+    re_ranker: ReRankerModel,
+    recommender: RecommendationEngine,
+) -> None:
+    """
+    Load both models with a dummy inference and touch the index, so the
+    first real request does not pay for model loading or cold pages.
+    """
+    start = time.perf_counter()
+    embedder.load()
+    re_ranker.rank(WARM_UP_TEXT, [WARM_UP_TEXT])
+    warm_index(recommender)
+    print(f"Warm-up done in {time.perf_counter() - start:.2f}s")
+
+
+def warm_index(recommender: RecommendationEngine) -> None:
+    query_vector = recommender.embedding_model.embed_text(WARM_UP_TEXT)
+    recommender.index.search(query_vector, top_k=1)
+
+
+def reload_snapshot() -> bool:
+    """
+    Load the CURRENT index snapshot and swap it in if it is new.
+    Requests already holding the old engine finish on it.
+    """
+    if not RELOAD_LOCK.acquire(blocking=False):
+        return False  # another reload is in progress
 
-@router.on_event("startup")
-def startup():
-    pass
-    # Equivalent of your main()
+    try:
+        builder = IndexBuilder(STATE.repo, STATE.embedder)
+        version = builder.current_version()
+        if version is None or version == STATE.snapshot_version:
+            return False
+
+        builder.verify_snapshot(version)
+        repo, recommender, version = load_recommender(
+            STATE.embedder,
+            STATE.re_ranker,
+            version,
+        )
+        warm_index(recommender)
+        title_index = repo.title_index
+
+        # Swap references: a single assignment each, no request sees a mix
+        STATE.repo = repo
+        set_title_index(title_index)
+        STATE.recommender = recommender
+        STATE.snapshot_version = version
+        print(f"Swapped in index snapshot {version} 🔄")
+        return True
+    finally:
+        RELOAD_LOCK.release()
 
 
+def watch_snapshots():
+    """
+    Poll the CURRENT pointer and hot-swap new snapshots.
+    """
+    while True:
+        time.sleep(SNAPSHOT_WATCH_INTERVAL_S)
+        try:
+            reload_snapshot()
+        except Exception as e:
+            print(f"Snapshot reload failed: {e}")
+
+
+# ----------------------------
+# Metrics read at scrape time
+# ----------------------------
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    stats = {
+        "result": RESULT_CACHE.stats(),
+        "candidate_pool": CANDIDATE_POOLS.stats(),
+    }
+    if STATE.embedder is not None:
+        stats["embedding"] = STATE.embedder.cache.stats()
+    if STATE.re_ranker is not None:
+        stats["rerank"] = STATE.re_ranker.cache.stats()
+    if STATE.repo is not None:
+        titles = STATE.repo.title_index.stats()
+        stats["title_index"] = {
+            "hits": titles["exact_hits"] + titles["fuzzy_hits"],
+            "misses": titles["misses"],
+            "size": titles["titles"],
+        }
+    return stats
+
+
+for _field, _kind, _doc in (
+    ("hits", "counter", "Cache lookups answered from the cache."),
+    ("misses", "counter", "Cache lookups that had to compute the value."),
+    ("size", "gauge", "Entries currently held by the cache."),
+):
+    CallbackMetric(
+        f"moviebot_cache_{_field}" + ("_total" if _kind == "counter" else ""),
+        _doc,
+        _kind,
+        ["cache"],
+        lambda _field=_field: {(name,): s.get(_field) for name, s in cache_stats().items()},
+    )
+
+CallbackMetric(
+    "moviebot_active_sessions",
+    "Conversations holding a live \"show more\" candidate pool.",
+    "gauge",
+    [],
+    lambda: {(): CANDIDATE_POOLS.active_count()},
+)
+
+
+def title_lookup_counts() -> Dict[tuple, Any]:
+    if STATE.repo is None:
+        return {}
+    titles = STATE.repo.title_index.stats()
+    return {(result,): titles[field] for result, field in (
+        ("exact", "exact_hits"),
+        ("fuzzy", "fuzzy_hits"),
+        ("miss", "misses"),
+    )}
+
+
+CallbackMetric(
+    "moviebot_title_lookups_total",
+    "Typed-title lookups by outcome; hits skip the LLM.",
+    "counter",
+    ["result"],
+    title_lookup_counts,
+)
+
+
+def embedding_queue_stats() -> Dict[str, Any]:
+    if isinstance(STATE.embedder, EmbeddingService):
+        return STATE.embedder.stats()
+    return {}
+
+
+CallbackMetric(
+    "moviebot_embed_queue_depth",
+    "Embedding requests waiting for the micro-batcher.",
+    "gauge",
+    [],
+    lambda: {(): embedding_queue_stats().get("queue_depth")},
+)
+CallbackMetric(
+    "moviebot_embed_rejected_total",
+    "Embedding requests rejected because the micro-batching queue was full.",
+    "counter",
+    [],
+    lambda: {(): embedding_queue_stats().get("rejected")},
+)
+
 
 # ----------------------------
 # API models
@@ -85,12 +289,43 @@ class RecommendationOut(BaseModel):
 class MessageOut(BaseModel):
     reply: str
     recommendations: List[RecommendationOut] = []
+    cursor: Optional[str] = None  # pass to /more for the next page
+
+
+class PageOut(BaseModel):
+    recommendations: List[RecommendationOut] = []
+    cursor: Optional[str] = None
+
+
+class SimilarOut(BaseModel):
+    movie_id: int
+    title: str
+    recommendations: List[RecommendationOut] = []
+
+
+class ReloadOut(BaseModel):
+    status: str
+    snapshot_version: Optional[str] = None
+
+
+@timed("serialize")
+def to_recommendations(df: pd.DataFrame) -> List[RecommendationOut]:
+    return [
+        RecommendationOut(
+            title=row["title"],
+            genres=row.get("genres", "") if pd.notna(row["genres"]) else "",
+            runtime=row.get("runtime"),
+            final_score=float(row["final_score"]),
+        )
+        for _, row in df.iterrows()
+    ]
 
 
 # ----------------------------
 # API endpoint
 # ----------------------------
 @router.post("/message", response_model=MessageOut)
+@instrumented("message")
 def message(payload: MessageIn):
     ensure_initialized()
     reply, ready, state, exited = STATE.chatbot.handle_user_message(payload.text)
@@ -120,22 +355,91 @@ def message(payload: MessageIn):
     user_profile = get_useful_info(state)
     print("================user profile:=====================",user_profile)
     state.is_complete = True
-    recommended_df = STATE.recommender.recommend(user_profile)
-
-    recommendations = [
-        RecommendationOut(
-            title=row["title"],
-            genres=row.get("genres", "") if pd.notna(row["genres"]) else "",
-            runtime=row.get("runtime"),
-            final_score=float(row["final_score"]),
-        )
-        for _, row in recommended_df.iterrows()
-    ]
+    recommender = STATE.recommender  # pin the snapshot for this request
+    try:
+        recommended_df, cursor = CANDIDATE_POOLS.open(recommender, user_profile)
+    except EmbeddingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    
+    if recommended_df.empty:
+        EMPTY_RESULTS.inc(endpoint="message")
 
     return MessageOut(
         reply="🎬 Here are some movies you might enjoy! Please enter exit to reset the chat",
-        recommendations=recommendations,
+        recommendations=to_recommendations(recommended_df),
+        cursor=cursor,
         exited= False
     )
+
+
+@router.get("/more", response_model=PageOut)
+@instrumented("more")
+def more(cursor: str):
+    """
+    Next page of the conversation's candidate pool ("show more").
+    """
+    ensure_initialized()
+    try:
+        page_df, next_cursor = CANDIDATE_POOLS.next_page(cursor)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cursor expired, please ask again")
+    except EmbeddingQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if page_df.empty:
+        EMPTY_RESULTS.inc(endpoint="more")
+
+    return PageOut(recommendations=to_recommendations(page_df), cursor=next_cursor)
+
+
+@router.get("/similar/{movie_id}", response_model=SimilarOut)
+@instrumented("similar")
+def similar(movie_id: int, top_k: int = Query(10, ge=1, le=NEIGHBOUR_TABLE_K)):
+    """
+    Movies most similar to movie_id, served from the neighbour table.
+    """
+    ensure_initialized()
+    recommender = STATE.recommender  # pin the snapshot for this request
+    try:
+        movie = recommender.repository.get_movie_by_id(movie_id)
+        similar_df = recommender.similar(movie_id, top_k=top_k)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=404, detail=f"Movie {movie_id} not found")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if similar_df.empty:
+        EMPTY_RESULTS.inc(endpoint="similar")
+
+    return SimilarOut(
+        movie_id=movie_id,
+        title=movie["title"],
+        recommendations=to_recommendations(similar_df),
+    )
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Admin endpoints need the X-Admin-Token header to equal the
+    ADMIN_TOKEN environment variable; they are disabled when it is unset.
+    """
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin token")
+
+
+@router.post(
+    "/admin/reload",
+    response_model=ReloadOut,
+    status_code=202,
+    dependencies=[Depends(require_admin_token)],
+)
+def reload(background_tasks: BackgroundTasks):
+    """
+    Load the CURRENT index snapshot in the background and hot-swap it.
+    """
+    ensure_initialized()
+    background_tasks.add_task(reload_snapshot)
+    return ReloadOut(status="reloading", snapshot_version=STATE.snapshot_version)
@@ -1,10 +1,32 @@
+from contextlib import asynccontextmanager
+import threading
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 
+def warm_up_in_background():
+    from app.api import ensure_initialized
+    try:
+        ensure_initialized()
+    except Exception as e:
+        print(f">>> Warm-up failed: {e}")
 
-app = FastAPI(title="MovieBot", version="1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(">>> Attaching API router")
+    from app.api import router
+    app.include_router(router, prefix="/api")
+    print(">>> API router attached")
+
+    # Load + warm models off the event loop; /readyz flips once done
+    threading.Thread(target=warm_up_in_background, daemon=True).start()
+    yield
+
+
+app = FastAPI(title="MovieBot", version="1.0", lifespan=lifespan)
 print(">>> APP created")
 
 # Static + templates
@@ -22,12 +44,26 @@ print(">>>  main.py static mounted")
 # app.include_router(api_router, prefix="/api")
 # print(">> main.py router included")
 
-@app.on_event("startup")
-def attach_router():
-    print(">>> Attaching API router")
-    from app.api import router
-    app.include_router(router, prefix="/api")
-    print(">>> API router attached")
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: models are loaded and warmed, the index is queryable."""
+    from app.api import STATE
+    if not STATE.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready", "snapshot_version": STATE.snapshot_version}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint: stage/request latencies, caches, sessions."""
+    from src.monitoring.metrics import REGISTRY
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
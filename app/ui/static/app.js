@@ -2,6 +2,10 @@ const messages = document.getElementById("messages");
 const recs = document.getElementById("recs");
 const input = document.getElementById("input");
 const send = document.getElementById("send");
+const more = document.getElementById("more");
+
+let nextCursor = null;
+let shownCount = 0;
 
 function addMessage(role, text){
   const wrap = document.createElement("div");
@@ -24,16 +28,27 @@ function setLoading(isLoading){
   }
 }
 
-function renderRecs(items){
-  if(!items || items.length === 0){
+function setCursor(cursor){
+  nextCursor = cursor || null;
+  more.hidden = !nextCursor;
+  more.disabled = false;
+}
+
+function renderRecs(items, append = false){
+  if(!append && (!items || items.length === 0)){
+    shownCount = 0;
     recs.classList.add("empty");
     recs.innerHTML = `<div class="empty-state">No recommendations yet.</div>`;
     return;
   }
   recs.classList.remove("empty");
-  recs.innerHTML = "";
+  if(!append){
+    recs.innerHTML = "";
+    shownCount = 0;
+  }
 
-  items.slice(0,5).forEach((m, idx) => {
+  (items || []).forEach((m) => {
+    const idx = shownCount++;
     const card = document.createElement("div");
     card.className = "card";
 
@@ -107,6 +122,7 @@ async function sendMessage(){
     }
 
     renderRecs(data.recommendations);
+    setCursor(data.cursor);
   } catch(e){
     addMessage("bot", "Something went wrong calling the server.");
   } finally {
@@ -116,7 +132,28 @@ async function sendMessage(){
   }
 }
 
+async function showMore(){
+  if(!nextCursor) return;
+  more.disabled = true;
+
+  try{
+    const res = await fetch(`/api/more?cursor=${encodeURIComponent(nextCursor)}`);
+    if(!res.ok){
+      setCursor(null);
+      addMessage("bot", "Those results expired, please ask me again.");
+      return;
+    }
+    const data = await res.json();
+    renderRecs(data.recommendations, true);
+    setCursor(data.cursor);
+  } catch(e){
+    more.disabled = false;
+    addMessage("bot", "Something went wrong calling the server.");
+  }
+}
+
 send.addEventListener("click", sendMessage);
+more.addEventListener("click", showMore);
 input.addEventListener("keydown", (e) => {
   if(e.key === "Enter") sendMessage();
 });
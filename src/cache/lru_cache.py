@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import threading
+import time
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU cache with an optional TTL.
+    Tracks hits, misses, evictions and expirations.
+    """
+
+    def __init__(self, max_size: int, ttl_s: float = 0):
+        """
+        :param max_size: maximum number of entries (0 disables caching)
+        :param ttl_s: seconds an entry stays valid (0 = no expiry)
+        """
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s > 0 else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """
+        Drop every expired entry; returns how many were dropped.
+        """
+        if self.ttl_s <= 0:
+            return 0
+
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._data.items() if expires_at < now]
+            for key in expired:
+                del self._data[key]
+            self.expirations += len(expired)
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
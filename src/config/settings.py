@@ -9,6 +9,11 @@ DATASET_DIR = PROJECT_ROOT / "datasets" / "cleaned"
 # MOVIES_CSV_PATH = DATASET_DIR / "movies_cleaned.csv"
 MOVIES_CSV_PATH = DATASET_DIR / "movies_cleaned_2.csv"
 
+# Typed columnar copy of the CSV (one .npy per column), rebuilt when the
+# CSV's size/mtime and content hash change; None reads the CSV directly
+CATALOG_CACHE_DIR = DATASET_DIR / "columnar"
+CATALOG_CATEGORICAL_COLUMNS = ("language", "genres")
+
 #=========Mood Predictor================
 MODEL_PATH = PROJECT_ROOT /"src" /"models" / "emotion_model"
 MODEL_NAME = "borisn70/bert-43-multilabel-emotion-detection"
@@ -19,22 +24,157 @@ MODEL_NAME = "borisn70/bert-43-multilabel-emotion-detection"
 EMBEDDING_MODEL_NAME = "all-mpnet-base-v2"
 EMBEDDING_DTYPE = "float32"
 
+RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# ========================
+# Inference backend
+# ========================
+# "torch" or "onnx" (ONNX Runtime, needs onnxruntime + optimum and a
+# one-off export: python -m src.models.onnx_backend). Falls back to
+# torch when the export is missing.
+MODEL_BACKEND = "torch"
+ONNX_MODEL_DIR = PROJECT_ROOT / "src" / "models" / "onnx"
+ONNX_QUANTIZE = True              # dynamic int8 quantization
+ONNX_QUANTIZATION_CONFIG = "avx2" # arm64 / avx2 / avx512 / avx512_vnni
+ONNX_INTRA_OP_THREADS = 0         # 0 = all cores
+ONNX_PARITY_MIN_COSINE = 0.99     # min cosine of quantized vs fp32 embeddings
+
+# Query embedding cache (keyed on normalized text + model name)
+EMBEDDING_CACHE_SIZE = 4096       # max cached texts (0 = off)
+EMBEDDING_CACHE_TTL_S = 0         # seconds before an entry expires (0 = never)
+
+# Micro-batching of concurrent query embeddings in the API
+EMBED_MICRO_BATCHING = True
+EMBED_BATCH_MAX_WAIT_MS = 5       # flush once the oldest request waited this long
+EMBED_BATCH_MAX_SIZE = 32         # ... or once this many texts are queued
+EMBED_BATCH_QUEUE_DEPTH = 256     # pending requests before rejecting new ones
+
 # ========================
 # FAISS configuration
 # ========================
 FAISS_INDEX_DIR = PROJECT_ROOT / "datasets" / "faiss"
 FAISS_INDEX_PATH = FAISS_INDEX_DIR / "movies.index"
 
+# Append-only store of catalog embeddings (independent of index type),
+# so indexes can be rebuilt without re-running the embedding model
+EMBEDDING_STORE_PATH = FAISS_INDEX_DIR / "movies.embeddings"
+EMBEDDING_STORE_COMPACT_RATIO = 0.3   # compact once this share of records is superseded/deleted
+
+# Corpus (re)embedding in IndexBuilder: large jobs run on a process
+# pool with per-chunk checkpoints so interrupted runs resume
+CORPUS_EMBED_WORKERS = 4          # processes (1 = embed in-process)
+CORPUS_EMBED_MIN_ROWS = 2000      # smaller jobs stay in-process
+CORPUS_EMBED_CHUNK_SIZE = 512     # rows per checkpointed chunk
+CORPUS_EMBED_BATCH_SIZE = 32      # encode() batch size inside a chunk
+CORPUS_EMBED_CHECKPOINT_DIR = FAISS_INDEX_DIR / "embed_checkpoints"
+
+# Versioned snapshots: each build writes snapshots/<version>/ with a
+# manifest, and snapshots/CURRENT names the one being served
+FAISS_SNAPSHOT_DIR = FAISS_INDEX_DIR / "snapshots"
+FAISS_SNAPSHOTS_TO_KEEP = 3
+SNAPSHOT_WATCH_INTERVAL_S = 0     # poll CURRENT and hot-swap (0 = off)
+
+# Index type: "flat" (exact), "ivf_flat", "hnsw", "ivf_pq",
+# or the compressed flat types "sq8" (8-bit scalar) and "pq"
+FAISS_INDEX_TYPE = "flat"
+
+# Split the catalog across N index shards searched in parallel (1 = off)
+FAISS_NUM_SHARDS = 1
+
+# Build-time parameters (persisted next to the index)
+FAISS_NLIST = 256                 # IVF: number of coarse clusters
+FAISS_HNSW_M = 32                 # HNSW: neighbours per node
+FAISS_HNSW_EF_CONSTRUCTION = 200  # HNSW: build-time beam width
+FAISS_PQ_M = 64                   # IVF-PQ: sub-quantizers (must divide dim)
+FAISS_PQ_NBITS = 8                # IVF-PQ: bits per sub-quantizer code
+FAISS_TRAIN_SAMPLE_SIZE = 50_000  # max vectors used to train IVF/PQ
+FAISS_PCA_DIM = 0                 # compressed types: PCA output dim (0 = off)
+
+# Query-time parameters (recall vs latency)
+FAISS_NPROBE = 16                 # IVF: clusters visited per query
+FAISS_EF_SEARCH = 64              # HNSW: search beam width
+FAISS_RESCORE_FACTOR = 4          # compressed types: fetch k * factor, rescore exactly
+
+# Precomputed item-item neighbours per snapshot ("more like this")
+NEIGHBOUR_TABLE_K = 20            # neighbours stored per movie (0 = off)
+NEIGHBOUR_BATCH_SIZE = 1024       # queries per batched self-search
+
+# Serve the index and mapping memory-mapped (read-only) so that
+# worker processes share one page-cache copy
+FAISS_LOAD_MMAP = True
+
 # ========================
 # Recommendation defaults
 # ========================
 TOP_K_RECOMMENDATIONS = 10
 
+# Filtered retrieval: below this share of the catalog, scan the
+# matching rows exactly instead of running a filtered ANN search
+FILTER_EXACT_SCAN_RATIO = 0.02
+# At or above this share, search without an ID selector (building one
+# costs a pass over the catalog) and drop filtered rows afterwards
+FILTER_POST_FILTER_RATIO = 0.5
+
+# Cross-encoder second stage (needs a ReRankerModel passed to the engine)
+RERANK_ENABLED = True
+RERANK_TOP_N = 30                 # candidates rescored after hard filters
+RERANK_BATCH_SIZE = 16            # pairs per cross-encoder call
+RERANK_WEIGHT = 0.5               # weight of sigmoid(rerank score) in final_score
+RERANK_CACHE_SIZE = 50_000        # memoized (query, movie_id) scores
+RECOMMEND_TIME_BUDGET_MS = 300    # reranking is truncated/skipped past this
+
+# Result cache in front of recommend() (keyed on the canonical profile,
+# invalidated when the index snapshot / catalog changes)
+RESULT_CACHE_SIZE = 1024          # cached result lists (0 = off)
+RESULT_CACHE_TTL_S = 600          # seconds before a result expires (0 = never)
+
+# Hybrid retrieval: a BM25 inverted index over title/cast/keywords runs
+# next to FAISS and the two ranked lists are merged by reciprocal-rank fusion
+HYBRID_ENABLED = True
+LEXICAL_FIELDS = ("title", "cast", "keywords")
+LEXICAL_TOP_K = 50                # lexical candidates fused per query
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60                        # fused score = sum of 1 / (RRF_K + rank)
+# fused_score is rescaled to (0, 1] (1 = first in both lists; first in one
+# list alone is ~0.5) and added to the cosine similarity_score with this
+# weight; GENRE_BOOST and RERANK_WEIGHT stay tuned against cosine
+RRF_WEIGHT = 0.5
+
+# "Show more" pagination: each recommendation keeps its ranked
+# candidate pool server-side behind a cursor
+PAGINATION_POOL_SIZE = 50         # candidates ranked up front per conversation
+PAGINATION_MAX_POOLS = 1024       # pools kept at once (LRU)
+PAGINATION_TTL_S = 900            # seconds a cursor stays valid
+
+# Similar-movie step: a title found in the catalog (exact normalized
+# match, else rapidfuzz ratio) skips the LLM and queries with the
+# movie's stored embedding
+TITLE_MATCH_MIN_SCORE = 90        # min fuzz.ratio (0-100) for a fuzzy title hit
+TITLE_MATCH_MIN_LENGTH = 3        # shorter inputs are never matched
+TITLE_MATCH_MIN_TOKENS = 2        # words needed to match without a lead-in ("like ...")
+
+# Diversity re-ranking (maximal marginal relevance) of the final list
+MMR_ENABLED = False
+MMR_LAMBDA = 0.7                  # 1 = pure relevance, lower = more diverse
+MMR_POOL_SIZE = 100               # best candidates considered by MMR
+
 # Similarity weights (used later)
 GENRE_BOOST = 0.3
 LANGUAGE_BOOST = 0.3
 POPULARITY_BOOST = 0.05
 
+# Soft boosts added to the similarity score: name -> weight.
+# Built-ins live in src/recommender/scoring.py (genre, popularity,
+# language, recency, vote_confidence); custom boosts can be given as
+# "package.module:ClassName". A weight of 0 disables a boost.
+SOFT_BOOSTS = {
+    "genre": GENRE_BOOST,
+    "popularity": POPULARITY_BOOST,
+}
+RECENCY_HALF_LIFE_YEARS = 15      # recency boost halves every N years
+VOTE_CONFIDENCE_MIN_VOTES = 50    # vote_count at which confidence is 0.5
+
 YES_WORDS = ["yes", "yeah", "yep", "sure", "okay", "ok", "Yah", "absolutely", "definitely","Yes please","Ya", 'y', 'yea', "sure"]
 NO_WORDS = ["no", "nope", "nah", "not really", "don't", "do not","No thanks","No thank you", 'n', 'nah', 'noo']
 LANGUAGES = [
@@ -14,6 +14,8 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from src.config.settings import genres,YES_WORDS,NO_WORDS, LANGUAGES
 from src.llm.extract_movie_info import extract_movie_info
+from src.data.title_index import TitleIndex
+from src.monitoring.metrics import STAGE_SECONDS, timed
 
 # spell = SpellChecker()
 
@@ -34,11 +36,28 @@ except LookupError as e:
 # Define the stop words set globally for maximum efficiency
 STOP_WORDS_SET = set(stopwords.words('english'))
 
+# Catalog titles, set by the app once the dataset is loaded
+TITLE_INDEX: Optional[TitleIndex] = None
+
+
+def set_title_index(title_index: Optional[TitleIndex]) -> None:
+    global TITLE_INDEX
+    TITLE_INDEX = title_index
+
 
 def extract_plot_text(text: str, state) -> str:
     if not text:
         return text
 
+    # Known title: use the catalog movie, no LLM round-trip
+    state.similar_movie_id = None
+    if TITLE_INDEX is not None:
+        with STAGE_SECONDS.time(stage="title_lookup"):
+            match = TITLE_INDEX.lookup(text)
+        if match is not None:
+            state.similar_movie_id = match.movie_id
+            return match.description
+
     enriched = extract_movie_info(text)
     if not enriched:
         return text
@@ -59,6 +78,7 @@ def remove_stopwords(text: str) -> str:
    return ' '.join(filtered_sentence)
 
 
+@timed("parse_yes_no")
 def detect_yes_no(text: str):
  text = text.lower().strip() if text is not None else ''
 
@@ -96,6 +116,7 @@ def detect_yes_no(text: str):
 # -------------------------------
 # Genre extraction
 # -------------------------------
+@timed("parse_genre")
 def extract_genre(text: str):
     CORRECT_GENRES = [ g.lower() for g in genres]
     lowercased_text=text.lower()
@@ -115,6 +136,7 @@ def extract_genre(text: str):
     return list(set(corrected_genres))
 
 
+@timed("parse_language")
 def extract_language(text: str):
     result = detect_yes_no(text)
 
@@ -147,6 +169,7 @@ all_language_names = [language.name for language in pycountry.languages]
 # -------------------------------
 
 
+@timed("parse_runtime")
 def extract_runtime(text: str) -> Optional[Dict[str, Any]]:
     text= text if text is not None else None
     t = text.lower().strip()
@@ -11,6 +11,7 @@ class ConversationState:
     suggested_genres: List[str] = field(default_factory=list)
     selected_genres: List[str] = None
     movie_description: str = None
+    similar_movie_id: Optional[int] = None
     language: Optional[str] = None
     res: Optional[MovieGenre] = None
     runtime: Optional[str] = None
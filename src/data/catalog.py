@@ -0,0 +1,154 @@
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+
+class MovieCatalog:
+    """
+    Column arrays for the fields used while ranking, one row per
+    movie_id, plus a movie_id -> row hash index.
+
+    Rows follow `order` (the FAISS mapping) when given, so index labels
+    translate to rows with one vectorized lookup. Hard filters and
+    boosts run on these arrays; a DataFrame is only materialized for
+    the final top-k.
+    """
+
+    def __init__(self, df: pd.DataFrame, order: Optional[np.ndarray] = None):
+        df = df.drop_duplicates(subset=["movie_id"], keep="last")
+
+        if order is not None:
+            # Indexed movies first, in mapping order, then the rest
+            order = pd.unique(np.asarray(order, dtype=np.int64))
+            position = pd.Index(df["movie_id"]).get_indexer(order)
+            rest = np.setdiff1d(np.arange(len(df)), position[position >= 0], assume_unique=True)
+            df = df.iloc[np.concatenate([position[position >= 0], rest])]
+
+        self.frame = df.reset_index(drop=True)
+        self.movie_id = self.frame["movie_id"].to_numpy(dtype=np.int64)
+        self._row_index = pd.Index(self.movie_id)
+
+        self.runtime = self._numeric("runtime", np.float32)
+        self.release_year = self._numeric("release_year", np.float32)
+        self.vote_average = self._numeric("vote_average", np.float32)
+        self.vote_count = self._numeric("vote_count", np.float32)
+
+        codes, self.languages = pd.factorize(self.frame["language"], use_na_sentinel=True)
+        self.language_code = codes.astype(np.int16)
+        self._language_codes = {name: code for code, name in enumerate(self.languages)}
+
+        self.genre_names, self.genre_mask = self._genre_bitmask(self.frame["genres"])
+        self._genre_bits = {name: np.uint64(1) << np.uint64(bit) for bit, name in enumerate(self.genre_names)}
+
+    def __len__(self) -> int:
+        return len(self.movie_id)
+
+    # -----------------------------
+    # LOOKUPS
+    # -----------------------------
+    def rows_for(self, movie_ids: Iterable[int]) -> np.ndarray:
+        """
+        Row of each movie_id (-1 when unknown).
+        """
+        return self._row_index.get_indexer(np.asarray(movie_ids, dtype=np.int64))
+
+    def row_of(self, movie_id: int) -> Optional[int]:
+        row = self.rows_for([movie_id])[0]
+        return None if row < 0 else int(row)
+
+    def language_codes(self, names: Iterable[str]) -> np.ndarray:
+        return np.array(
+            [self._language_codes[name] for name in names if name in self._language_codes],
+            dtype=np.int16,
+        )
+
+    def genre_bits(self, names: Optional[Iterable[str]]) -> np.uint64:
+        bits = np.uint64(0)
+        for name in names or []:
+            bits |= self._genre_bits.get(str(name).strip().lower(), np.uint64(0))
+        return bits
+
+    def to_frame(self, rows: np.ndarray, **columns: np.ndarray) -> pd.DataFrame:
+        """
+        Materialize the given rows (in order) with extra score columns.
+        """
+        df = self.frame.iloc[rows].reset_index(drop=True)
+        for name, values in columns.items():
+            df[name] = values
+        return df
+
+    # -----------------------------
+    # FILTERS
+    # -----------------------------
+    def filter_mask(
+        self,
+        user_profile: Dict[str, Any],
+        rows: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Hard filters (language, runtime) over all rows or the given rows.
+        """
+        language_code = self.language_code if rows is None else self.language_code[rows]
+        runtime = self.runtime if rows is None else self.runtime[rows]
+        mask = np.ones(len(runtime), dtype=bool)
+
+        languages = user_profile.get("language")
+        if languages:
+            mask &= np.isin(language_code, self.language_codes(languages))
+
+        bounds = self.runtime_bounds(user_profile.get("runtime"))
+        if bounds:
+            if bounds.get("max") is not None:
+                mask &= runtime <= bounds["max"]
+            if bounds.get("min") is not None:
+                mask &= runtime >= bounds["min"]
+            if bounds.get("exact") is not None:
+                mask &= runtime == bounds["exact"]
+        else:
+            mask &= runtime >= 50
+
+        return mask
+
+    @staticmethod
+    def runtime_bounds(runtime: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Accept both {"max"/"min"/"exact": minutes} and the
+        {"type": ..., "minutes": ...} shape produced by extract_runtime.
+        """
+        if not runtime:
+            return {}
+        if "type" in runtime and "minutes" in runtime:
+            return {runtime["type"]: runtime["minutes"]}
+        return runtime
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    def _numeric(self, column: str, dtype: type) -> np.ndarray:
+        if column not in self.frame.columns:
+            return np.full(len(self.frame), np.nan, dtype=dtype)
+        return pd.to_numeric(self.frame[column], errors="coerce").to_numpy(dtype=dtype)
+
+    @staticmethod
+    def _genre_bitmask(genres: pd.Series) -> tuple[List[str], np.ndarray]:
+        """
+        Comma-separated genre strings -> one uint64 bitmask per row.
+        """
+        exploded = (
+            genres.astype(object)
+            .fillna("")
+            .astype(str)
+            .str.lower()
+            .str.split(",")
+            .explode()
+            .str.strip()
+        )
+        exploded = exploded[exploded != ""]
+        codes, names = pd.factorize(exploded)
+        if len(names) > 64:
+            raise ValueError(f"Too many distinct genres for a 64-bit mask: {len(names)}")
+
+        mask = np.zeros(len(genres), dtype=np.uint64)
+        bits = np.left_shift(np.uint64(1), codes.astype(np.uint64))
+        np.bitwise_or.at(mask, exploded.index.to_numpy(), bits)
+        return list(names), mask
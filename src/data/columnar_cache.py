@@ -0,0 +1,218 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from src.config.settings import (
+    CATALOG_CACHE_DIR,
+    CATALOG_CATEGORICAL_COLUMNS,
+    REQUIRED_COLUMNS,
+)
+
+
+FORMAT_VERSION = 1
+META_NAME = "meta.json"
+
+
+def load_catalog(csv_path: Path, cache_dir: Optional[Path] = CATALOG_CACHE_DIR) -> pd.DataFrame:
+    """
+    Load the movie CSV through its columnar cache, (re)building the
+    cache first when it is missing or the CSV changed.
+
+    Safe across processes: readers hold a shared lock on the cache and
+    one converter holds it exclusively, so workers starting together
+    convert once and never read a half-replaced cache.
+    """
+    if cache_dir is None:
+        return pd.read_csv(csv_path)
+
+    directory = Path(cache_dir) / Path(csv_path).stem
+    directory.parent.mkdir(parents=True, exist_ok=True)
+
+    with _locked(directory, fcntl.LOCK_SH):
+        if is_fresh(csv_path, directory):
+            return read_columnar(directory)
+
+    with _locked(directory, fcntl.LOCK_EX):
+        # Another process may have converted while we waited
+        if not is_fresh(csv_path, directory):
+            convert_csv(csv_path, directory)
+        return read_columnar(directory)
+
+
+def is_fresh(csv_path: Path, directory: Path) -> bool:
+    """
+    True if the cache was built from the CSV as it is now. Size and
+    mtime are checked first; if only those changed, the content hash
+    decides (and a touched but unchanged CSV keeps its cache).
+    """
+    meta = _read_meta(directory)
+    if meta is None or meta.get("format_version") != FORMAT_VERSION:
+        return False
+
+    stat = Path(csv_path).stat()
+    if meta["source_size"] == stat.st_size and meta["source_mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if meta["source_size"] != stat.st_size or meta["source_sha256"] != _file_sha256(csv_path):
+        return False
+
+    meta["source_mtime_ns"] = stat.st_mtime_ns
+    _write_meta(directory, meta)
+    return True
+
+
+def convert_csv(csv_path: Path, directory: Path) -> None:
+    """
+    Parse the CSV once and write one .npy file per column:
+    integers downcast to the smallest type, CATALOG_CATEGORICAL_COLUMNS
+    as codes + categories, other text as a UTF-8 blob + offsets.
+    The caller must hold the cache's exclusive lock (see load_catalog).
+    """
+    start = time.perf_counter()
+    stat = Path(csv_path).stat()
+    df = pd.read_csv(csv_path)
+
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Dataset missing required columns: {missing}")
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", suffix=".tmp", dir=directory.parent))
+    try:
+        os.chmod(tmp_dir, 0o755)  # mkdtemp creates it owner-only
+        columns = []
+        for position, name in enumerate(df.columns):
+            prefix = tmp_dir / f"{position:03d}"
+            columns.append({"name": name, **_write_column(prefix, df[name])})
+
+        _write_meta(tmp_dir, {
+            "format_version": FORMAT_VERSION,
+            "source": str(csv_path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_sha256": _file_sha256(csv_path),
+            "rows": len(df),
+            "columns": columns,
+        })
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    print(f"Converted {csv_path} to columnar cache ({len(df)} rows) in {time.perf_counter() - start:.2f}s")
+
+
+def read_columnar(directory: Path) -> pd.DataFrame:
+    """
+    Load a columnar cache. Numeric columns and category codes are
+    memory-mapped; each text column is decoded from one buffer.
+    """
+    meta = _read_meta(directory)
+    if meta is None:
+        raise FileNotFoundError(f"No columnar catalog at {directory}")
+
+    data = {}
+    for position, column in enumerate(meta["columns"]):
+        prefix = directory / f"{position:03d}"
+        data[column["name"]] = _read_column(prefix, column)
+
+    df = pd.DataFrame(data, copy=False)
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Columnar catalog missing required columns: {missing}")
+    return df
+
+
+# -----------------------------
+# INTERNAL HELPERS
+# -----------------------------
+@contextmanager
+def _locked(directory: Path, operation: int) -> Iterator[None]:
+    """
+    flock on a lock file next to the cache directory (shared for
+    readers, exclusive for the converter). Released on close.
+    """
+    with open(directory.with_name(f".{directory.name}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), operation)
+        yield
+
+
+def _write_column(prefix: Path, series: pd.Series) -> Dict[str, Any]:
+    if pd.api.types.is_integer_dtype(series.dtype):
+        values = pd.to_numeric(series, downcast="integer").to_numpy()
+        np.save(f"{prefix}.values.npy", values)
+        return {"kind": "numeric", "dtype": values.dtype.str}
+
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy()
+        np.save(f"{prefix}.values.npy", values)
+        return {"kind": "numeric", "dtype": values.dtype.str}
+
+    if series.name in CATALOG_CATEGORICAL_COLUMNS:
+        codes, categories = pd.factorize(series, sort=True, use_na_sentinel=True)
+        codes = pd.to_numeric(pd.Series(codes), downcast="integer").to_numpy()
+        np.save(f"{prefix}.codes.npy", codes)
+        return {"kind": "categorical", "categories": [str(c) for c in categories]}
+
+    nulls = series.isna().to_numpy()
+    texts = series.astype(object).where(~nulls, "").astype(str).tolist()
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in texts], out=offsets[1:])
+    np.save(f"{prefix}.blob.npy", np.frombuffer("".join(texts).encode("utf-8"), dtype=np.uint8))
+    np.save(f"{prefix}.offsets.npy", offsets)
+    if nulls.any():
+        np.save(f"{prefix}.nulls.npy", nulls)
+    return {"kind": "text", "has_nulls": bool(nulls.any())}
+
+
+def _read_column(prefix: Path, column: Dict[str, Any]) -> Any:
+    kind = column["kind"]
+    if kind == "numeric":
+        return np.load(f"{prefix}.values.npy", mmap_mode="r")
+
+    if kind == "categorical":
+        codes = np.load(f"{prefix}.codes.npy", mmap_mode="r")
+        return pd.Categorical.from_codes(codes, categories=column["categories"])
+
+    blob = np.load(f"{prefix}.blob.npy", mmap_mode="r")
+    offsets = np.load(f"{prefix}.offsets.npy").tolist()
+    text = blob.tobytes().decode("utf-8")
+    values = np.empty(len(offsets) - 1, dtype=object)
+    values[:] = [text[begin:end] for begin, end in zip(offsets[:-1], offsets[1:])]
+    if column["has_nulls"]:
+        values[np.load(f"{prefix}.nulls.npy")] = np.nan
+    return values
+
+
+def _read_meta(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((directory / META_NAME).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_meta(directory: Path, meta: Dict[str, Any]) -> None:
+    # Unique temp name: readers under the shared lock may refresh the
+    # mtime in meta concurrently
+    fd, tmp = tempfile.mkstemp(prefix=f".{META_NAME}.", suffix=".tmp", dir=directory)
+    with os.fdopen(fd, "w") as f:
+        f.write(json.dumps(meta, indent=2))
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, directory / META_NAME)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,9 +1,15 @@
+from pathlib import Path
 from typing import Optional, List
+import numpy as np
 import pandas as pd
 
+from src.data.catalog import MovieCatalog
+from src.data.columnar_cache import load_catalog
+from src.data.title_index import TitleIndex
 from src.config.settings import (
     MOVIES_CSV_PATH,
-    REQUIRED_COLUMNS
+    REQUIRED_COLUMNS,
+    CATALOG_CACHE_DIR,
 )
 
 
@@ -13,9 +19,13 @@ class MovieRepository:
     This class is the single source of truth for movie data access.
     """
 
-    def __init__(self, csv_path: Optional[str] = None):
+    def __init__(self, csv_path: Optional[str] = None, cache_dir: Optional[Path] = CATALOG_CACHE_DIR):
         self.csv_path = csv_path or MOVIES_CSV_PATH
+        self.cache_dir = cache_dir
         self._df: Optional[pd.DataFrame] = None
+        self._catalog: Optional[MovieCatalog] = None
+        self._title_index: Optional[TitleIndex] = None
+        self._first_rows: Optional[pd.Series] = None
 
     def load(self) -> None:
         """Load the movie dataset into memory."""
@@ -24,7 +34,10 @@ class MovieRepository:
                 f"Movie dataset not found at: {self.csv_path}"
             )
 
-        self._df = pd.read_csv(self.csv_path)
+        self._df = load_catalog(self.csv_path, self.cache_dir)
+        self._catalog = None
+        self._title_index = None
+        self._first_rows = None
         self._validate_schema()
 
     def _validate_schema(self) -> None:
@@ -45,6 +58,20 @@ class MovieRepository:
             raise RuntimeError("Call load() before accessing data")
         return self._df
 
+    @property
+    def catalog(self) -> MovieCatalog:
+        """Array-backed view of the dataset with a movie_id hash index."""
+        if self._catalog is None:
+            self._catalog = MovieCatalog(self.df)
+        return self._catalog
+
+    @property
+    def title_index(self) -> TitleIndex:
+        """Normalized/fuzzy title lookup over the dataset."""
+        if self._title_index is None:
+            self._title_index = TitleIndex(self.df)
+        return self._title_index
+
     def get_all_movies(self) -> pd.DataFrame:
         """Return full dataset."""
         return self.df.copy()
@@ -72,8 +99,16 @@ class MovieRepository:
         return df.copy()
 
     def get_movie_by_id(self, movie_id: int) -> pd.Series:
-        """Fetch a single movie by ID."""
-        movie = self.df[self.df["movie_id"] == movie_id]
-        if movie.empty:
+        """
+        Fetch a single movie by ID. With duplicate IDs the first row
+        wins (the catalog used for ranking keeps the last one).
+        """
+        if self._first_rows is None:
+            movie_ids = self.df["movie_id"]
+            first = ~movie_ids.duplicated(keep="first").to_numpy()
+            self._first_rows = pd.Series(np.flatnonzero(first), index=movie_ids.to_numpy()[first])
+
+        row = self._first_rows.get(movie_id)
+        if row is None:
             raise ValueError(f"Movie with id {movie_id} not found")
-        return movie.iloc[0]
+        return self.df.iloc[row]
@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import re
+import threading
+import unicodedata
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from src.config.settings import (
+    TITLE_MATCH_MIN_SCORE,
+    TITLE_MATCH_MIN_LENGTH,
+    TITLE_MATCH_MIN_TOKENS,
+)
+
+
+# "something like Frozen", "movies similar to Heat", "i loved Up", ...
+LEAD_IN_PATTERN = re.compile(
+    r"^(?:(?:i\s+(?:want|like|liked|love|loved|enjoyed)\s+)?"
+    r"(?:(?:something|anything|a\s+movie|movies?|films?|shows?)\s+)?"
+    r"(?:like|similar\s+to|such\s+as)\s+"
+    r"|i\s+(?:liked|loved|enjoyed)\s+)"
+)
+
+
+@dataclass
+class TitleMatch:
+    movie_id: int
+    title: str
+    description: str
+    score: float
+    exact: bool
+
+
+class TitleIndex:
+    """
+    Catalog titles for resolving a movie name typed by the user without
+    an LLM call: an exact normalized-title hash map, then a vectorized
+    rapidfuzz scan of all titles. Counts hits so the share of requests
+    that skip the LLM can be reported.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.drop_duplicates(subset=["movie_id"], keep="last")
+        df = df.assign(normalized=df["title"].fillna("").astype(str).map(self.normalize))
+        df = df[df["normalized"] != ""]
+
+        # The best-known movie wins when titles collide
+        if "vote_count" in df.columns:
+            df = df.sort_values("vote_count", ascending=False, kind="stable")
+        df = df.drop_duplicates(subset=["normalized"], keep="first")
+
+        self.titles = df["title"].astype(str).tolist()
+        self.descriptions = (
+            df["overview"].fillna(df["title"]).astype(str).tolist()
+            if "overview" in df.columns else self.titles
+        )
+        self.normalized = df["normalized"].tolist()
+        self.movie_ids = df["movie_id"].to_numpy(dtype=np.int64)
+        self._by_title = {title: i for i, title in enumerate(self.normalized)}
+
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        ASCII-folded, lowercase, punctuation-free, single-spaced.
+        """
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+        return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+    def lookup(self, text: str) -> Optional[TitleMatch]:
+        """
+        The catalog movie the text names, or None if no title matches
+        confidently. Without a lead-in ("like ...", "similar to ..."),
+        the text needs TITLE_MATCH_MIN_TOKENS words, so a lone common
+        word ("love") is not taken for a title.
+        """
+        normalized = self.normalize(text or "")
+        query = LEAD_IN_PATTERN.sub("", normalized)
+        named = query != normalized or len(query.split()) >= TITLE_MATCH_MIN_TOKENS
+        match = self._match(query) if named and len(query) >= TITLE_MATCH_MIN_LENGTH else None
+
+        with self._lock:
+            if match is None:
+                self.misses += 1
+            elif match.exact:
+                self.exact_hits += 1
+            else:
+                self.fuzzy_hits += 1
+        return match
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.fuzzy_hits
+            lookups = hits + self.misses
+            return {
+                "titles": len(self.titles),
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+            }
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    def _match(self, query: str) -> Optional[TitleMatch]:
+        position = self._by_title.get(query)
+        if position is not None:
+            return self._result(position, 100.0, exact=True)
+
+        scores = process.cdist(
+            [query],
+            self.normalized,
+            scorer=fuzz.ratio,
+            score_cutoff=TITLE_MATCH_MIN_SCORE,
+            dtype=np.uint8,
+        )[0]
+        position = int(np.argmax(scores))
+        if scores[position] < TITLE_MATCH_MIN_SCORE:
+            return None
+        return self._result(position, float(scores[position]), exact=False)
+
+    def _result(self, position: int, score: float, exact: bool) -> TitleMatch:
+        return TitleMatch(
+            movie_id=int(self.movie_ids[position]),
+            title=self.titles[position],
+            description=self.descriptions[position],
+            score=score,
+            exact=exact,
+        )
@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import multiprocessing
+import os
+import shutil
+import time
+import numpy as np
+
+from src.models.embedding_model import EmbeddingModel
+from src.config.settings import (
+    EMBEDDING_DTYPE,
+    CORPUS_EMBED_WORKERS,
+    CORPUS_EMBED_CHUNK_SIZE,
+    CORPUS_EMBED_BATCH_SIZE,
+    CORPUS_EMBED_CHECKPOINT_DIR,
+)
+
+
+# Model loaded once per worker process
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from src.models.onnx_backend import load_sentence_transformer
+    _worker_model = load_sentence_transformer(model_name)
+
+
+def _token_lengths(texts: List[str]) -> List[int]:
+    encoded = _worker_model.tokenizer(
+        texts,
+        add_special_tokens=False,
+        truncation=True,
+        max_length=_worker_model.max_seq_length,
+    )
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def _encode_chunk(texts: List[str], batch_size: int, checkpoint: str) -> int:
+    # Batch by token count so each batch pads to a similar length. One
+    # encode call per batch: encode() would re-sort by character length.
+    order = np.argsort(_token_lengths(texts), kind="stable")
+    batches = [
+        _worker_model.encode(
+            [texts[j] for j in order[i:i + batch_size]],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        for i in range(0, len(order), batch_size)
+    ]
+    vectors = np.empty((len(texts), batches[0].shape[1]), dtype=EMBEDDING_DTYPE)
+    vectors[order] = np.concatenate(batches)
+
+    # Write-then-rename so a killed worker never leaves a partial chunk
+    tmp = f"{checkpoint}.tmp.npy"
+    np.save(tmp, vectors)
+    os.replace(tmp, checkpoint)
+    return len(texts)
+
+
+class CorpusEncoder:
+    """
+    Embeds a whole corpus on a pool of worker processes.
+
+    Texts are sorted by character length and split into chunks, so a
+    chunk holds texts of similar length without tokenizing the corpus
+    in the parent process. Each worker then orders its chunk by exact
+    token count before batching. Every finished chunk is checkpointed
+    to disk under a content-derived name, so an interrupted run
+    resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        num_workers: int = CORPUS_EMBED_WORKERS,
+        chunk_size: int = CORPUS_EMBED_CHUNK_SIZE,
+        batch_size: int = CORPUS_EMBED_BATCH_SIZE,
+        checkpoint_dir: Path = CORPUS_EMBED_CHECKPOINT_DIR,
+    ):
+        self.model_name = model_name
+        self.num_workers = max(1, num_workers)
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.checkpoint_dir = checkpoint_dir
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts; rows come back in input order.
+        """
+        if not texts:
+            raise ValueError("Texts must be a non-empty list of strings")
+
+        texts = [EmbeddingModel.normalize_text(text) for text in texts]
+        # Character length only approximates token count; it is close
+        # enough to group chunks, and workers sort exactly within them
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        chunks = [order[i:i + self.chunk_size] for i in range(0, len(order), self.chunk_size)]
+        run_dir = self.checkpoint_dir / self._run_key(texts)
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        paths = [run_dir / f"chunk-{i:05d}.npy" for i in range(len(chunks))]
+        pending = [i for i, path in enumerate(paths) if not path.exists()]
+        if len(pending) < len(chunks):
+            print(f"Resuming corpus embedding: {len(chunks) - len(pending)}/{len(chunks)} chunks done")
+
+        start = time.perf_counter()
+        rows = 0
+        if pending:
+            threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+            with ProcessPoolExecutor(
+                max_workers=min(self.num_workers, len(pending)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, threads),
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _encode_chunk,
+                        [texts[j] for j in chunks[i]],
+                        self.batch_size,
+                        str(paths[i]),
+                    )
+                    for i in pending
+                ]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    rows += future.result()
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"Embedded chunk {done}/{len(pending)} "
+                        f"({rows / elapsed:.1f} rows/sec)"
+                    )
+
+        vectors: Optional[np.ndarray] = None
+        for chunk, path in zip(chunks, paths):
+            part = np.load(path)
+            if vectors is None:
+                vectors = np.empty((len(texts), part.shape[1]), dtype=EMBEDDING_DTYPE)
+            vectors[chunk] = part
+
+        if rows:
+            elapsed = time.perf_counter() - start
+            print(f"Embedded {rows} rows in {elapsed:.1f}s ({rows / elapsed:.1f} rows/sec)")
+
+        shutil.rmtree(run_dir, ignore_errors=True)
+        return vectors
+
+    def _run_key(self, texts: List[str]) -> str:
+        """
+        Identifies a run by model, chunking and corpus contents.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.model_name}|{self.chunk_size}".encode("utf-8"))
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
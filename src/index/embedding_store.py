@@ -0,0 +1,226 @@
+from pathlib import Path
+from typing import Optional, Tuple
+import json
+import os
+import numpy as np
+
+from src.config.settings import EMBEDDING_DTYPE
+
+
+MAGIC = b"MOVIEEMB"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4096
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mappable store of catalog embeddings keyed by movie_id.
+
+    Layout: a fixed-size header (magic + JSON with model name, dim and
+    dtype) followed by fixed-width records of
+    (movie_id, content hash, live flag, vector). Updates and deletes
+    append a new record; the last record for a movie_id wins.
+    """
+
+    def __init__(self, path: Path, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self.dim: Optional[int] = None
+        self._records: Optional[np.ndarray] = None
+        self._rows: dict[int, int] = {}
+
+        if self.path.exists():
+            self._open()
+
+    # -----------------------------
+    # READ
+    # -----------------------------
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return int(movie_id) in self._rows
+
+    def lookup(self, movie_ids: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """
+        Mask of movie_ids stored with the given content hash.
+        """
+        found = np.zeros(len(movie_ids), dtype=bool)
+        if self._records is None:
+            return found
+
+        stored_hashes = self._records["hash"]
+        for i, (mid, h) in enumerate(zip(movie_ids.tolist(), hashes.tolist())):
+            row = self._rows.get(mid)
+            found[i] = row is not None and stored_hashes[row] == h
+        return found
+
+    def get(self, movie_ids: np.ndarray) -> np.ndarray:
+        """
+        Vectors for movie_ids, shape (len(movie_ids), dim).
+        Raises KeyError for ids not in the store.
+        """
+        rows = self._rows_for(movie_ids)
+        return np.asarray(self._records["vector"][rows], dtype=EMBEDDING_DTYPE)
+
+    def stale_ratio(self) -> float:
+        """
+        Share of records on disk that are superseded or tombstones.
+        """
+        if self._records is None or len(self._records) == 0:
+            return 0.0
+        return 1 - len(self._rows) / len(self._records)
+
+    def ids(self) -> np.ndarray:
+        """
+        All live movie_ids, sorted.
+        """
+        return np.fromiter(sorted(self._rows), dtype=np.int64, count=len(self._rows))
+
+    def items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All live (movie_ids, vectors), ordered by movie_id.
+        """
+        if not self._rows:
+            return np.array([], dtype=np.int64), np.empty((0, self.dim or 0), dtype=EMBEDDING_DTYPE)
+
+        movie_ids = self.ids()
+        return movie_ids, self.get(movie_ids)
+
+    # -----------------------------
+    # WRITE
+    # -----------------------------
+    def append(self, movie_ids: np.ndarray, vectors: np.ndarray, hashes: np.ndarray) -> None:
+        """
+        Append (or supersede) vectors for movie_ids.
+        """
+        if len(movie_ids) == 0:
+            return
+
+        vectors = np.asarray(vectors, dtype=EMBEDDING_DTYPE)
+        if self.dim is None:
+            self._create(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dim {self.dim}, got {vectors.shape[1]}")
+
+        records = np.zeros(len(movie_ids), dtype=self._record_dtype(self.dim))
+        records["movie_id"] = movie_ids
+        records["hash"] = hashes
+        records["live"] = 1
+        records["vector"] = vectors
+        self._write(records)
+
+    def delete(self, movie_ids: np.ndarray) -> None:
+        """
+        Append tombstones for movie_ids present in the store.
+        """
+        movie_ids = np.array([mid for mid in movie_ids.tolist() if mid in self._rows], dtype=np.int64)
+        if len(movie_ids) == 0:
+            return
+
+        records = np.zeros(len(movie_ids), dtype=self._record_dtype(self.dim))
+        records["movie_id"] = movie_ids
+        self._write(records)
+
+    def compact(self) -> None:
+        """
+        Rewrite the file with only the latest live record per movie_id.
+        """
+        if self._records is None:
+            return
+
+        rows = np.fromiter(sorted(self._rows.values()), dtype=np.int64, count=len(self._rows))
+        live = np.array(self._records[rows])
+
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(self._header(self.dim))
+            f.write(live.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._open()
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    @staticmethod
+    def _record_dtype(dim: int) -> np.dtype:
+        return np.dtype([
+            ("movie_id", "<i8"),
+            ("hash", "S16"),
+            ("live", "u1"),
+            ("vector", EMBEDDING_DTYPE, (dim,)),
+        ])
+
+    def _header(self, dim: int) -> bytes:
+        meta = json.dumps({
+            "format_version": FORMAT_VERSION,
+            "model_name": self.model_name,
+            "dim": dim,
+            "dtype": EMBEDDING_DTYPE,
+        }).encode("utf-8")
+        header = MAGIC + len(meta).to_bytes(4, "little") + meta
+        if len(header) > HEADER_SIZE:
+            raise ValueError("Embedding store header too large")
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def _create(self, dim: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(self._header(dim))
+        self._open()
+
+    def _open(self) -> None:
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+
+        if not header.startswith(MAGIC):
+            raise ValueError(f"{self.path} is not an embedding store")
+
+        size = int.from_bytes(header[len(MAGIC):len(MAGIC) + 4], "little")
+        meta = json.loads(header[len(MAGIC) + 4:len(MAGIC) + 4 + size])
+        if meta["model_name"] != self.model_name:
+            raise ValueError(
+                f"Embedding store {self.path} holds {meta['model_name']} "
+                f"vectors, not {self.model_name}"
+            )
+
+        self.dim = meta["dim"]
+        self._remap()
+
+    def _remap(self) -> None:
+        record_dtype = self._record_dtype(self.dim)
+        count = (self.path.stat().st_size - HEADER_SIZE) // record_dtype.itemsize
+        if count == 0:
+            self._records = np.empty(0, dtype=record_dtype)
+            self._rows = {}
+            return
+
+        self._records = np.memmap(
+            self.path,
+            dtype=record_dtype,
+            mode="r",
+            offset=HEADER_SIZE,
+            shape=(count,),
+        )
+
+        # Last record per movie_id wins; tombstones hide the id
+        movie_ids = self._records["movie_id"][::-1]
+        unique_ids, first = np.unique(movie_ids, return_index=True)
+        rows = count - 1 - first
+        live = self._records["live"][rows].astype(bool)
+        self._rows = dict(zip(unique_ids[live].tolist(), rows[live].tolist()))
+
+    def _write(self, records: np.ndarray) -> None:
+        with open(self.path, "ab") as f:
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._remap()
+
+    def _rows_for(self, movie_ids: np.ndarray) -> np.ndarray:
+        try:
+            return np.array([self._rows[mid] for mid in np.asarray(movie_ids).tolist()], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"movie_id {e.args[0]} not in embedding store") from None
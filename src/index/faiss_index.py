@@ -1,62 +1,210 @@
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 from pathlib import Path
+import json
 import numpy as np
 import faiss
 
+from src.config.settings import (
+    FAISS_INDEX_TYPE,
+    FAISS_NLIST,
+    FAISS_HNSW_M,
+    FAISS_HNSW_EF_CONSTRUCTION,
+    FAISS_PQ_M,
+    FAISS_PQ_NBITS,
+    FAISS_TRAIN_SAMPLE_SIZE,
+    FAISS_PCA_DIM,
+    FAISS_NPROBE,
+    FAISS_EF_SEARCH,
+    FAISS_RESCORE_FACTOR,
+)
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq", "sq8", "pq")
+
+# Lossy index types: keep full-precision vectors on disk for rescoring
+COMPRESSED_INDEX_TYPES = ("ivf_pq", "sq8", "pq")
+
+
+def default_index_params() -> Dict[str, Any]:
+    """
+    Index parameters taken from settings.py.
+    """
+    return {
+        "nlist": FAISS_NLIST,
+        "hnsw_m": FAISS_HNSW_M,
+        "ef_construction": FAISS_HNSW_EF_CONSTRUCTION,
+        "pq_m": FAISS_PQ_M,
+        "pq_nbits": FAISS_PQ_NBITS,
+        "train_sample_size": FAISS_TRAIN_SAMPLE_SIZE,
+        "pca_dim": FAISS_PCA_DIM,
+        "nprobe": FAISS_NPROBE,
+        "ef_search": FAISS_EF_SEARCH,
+        "rescore_factor": FAISS_RESCORE_FACTOR,
+    }
+
 
 class FaissIndex:
     """
     Thin wrapper around FAISS index for vector similarity search.
     """
 
-    def __init__(self, dim: int):
+    def __init__(
+        self,
+        dim: int,
+        index_type: str = FAISS_INDEX_TYPE,
+        params: Optional[Dict[str, Any]] = None,
+    ):
         """
         :param dim: embedding dimension (e.g. 768 for SBERT)
+        :param index_type: one of INDEX_TYPES
+        :param params: overrides for default_index_params()
         """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}"
+            )
+
         self.dim = dim
+        self.index_type = index_type
+        self.params = {**default_index_params(), **(params or {})}
         self.index: faiss.Index | None = None
+        self.read_only = False
+
+        # Full-precision vectors (sorted by id) for exact rescoring
+        # of compressed indexes
+        self.full_ids: np.ndarray | None = None
+        self.full_vectors: np.ndarray | None = None
 
     # -----------------------------
     # BUILD (fresh index)
     # -----------------------------
-    def build(self, vectors: np.ndarray) -> None:
+    def build(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> None:
         """
         Build a NEW FAISS index from vectors.
         This overwrites any existing index in memory.
+        :param ids: FAISS ids (e.g. movie_id); defaults to row positions
         """
         self._validate_vectors(vectors)
+        self._check_writable()
 
         faiss.normalize_L2(vectors)
 
-        self.index = faiss.IndexFlatIP(self.dim)
-        self.index.add(vectors)
+        self.index = self._create_index(len(vectors))
+        self._train(vectors)
+        ids = self._add_with_ids(vectors, ids)
+        self._apply_search_params()
+
+        self._reset_full_vectors()
+        self._store_full_vectors(vectors, ids)
 
     # -----------------------------
     # ADD (append vectors)
     # -----------------------------
-    def add(self, vectors: np.ndarray) -> None:
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> None:
         """
         Append vectors to an existing FAISS index.
-        Creates index if not present.
+        Creates (and trains) the index if not present.
+        :param ids: FAISS ids (e.g. movie_id); defaults to row positions
         """
         if vectors is None or len(vectors) == 0:
             return
 
         self._validate_vectors(vectors)
+        self._check_writable()
 
         faiss.normalize_L2(vectors)
 
         if self.index is None:
-            self.index = faiss.IndexFlatIP(self.dim)
+            self.index = self._create_index(len(vectors))
+            self._apply_search_params()
+            self._reset_full_vectors()
+
+        self._train(vectors)
+        ids = self._add_with_ids(vectors, ids)
+        self._store_full_vectors(vectors, ids)
+
+    # -----------------------------
+    # REMOVE
+    # -----------------------------
+    def remove(self, ids: np.ndarray) -> int:
+        """
+        Remove vectors by FAISS id. Returns the number removed.
+        """
+        if self.index is None or ids is None or len(ids) == 0:
+            return 0
+
+        if not self.id_mapped:
+            raise RuntimeError("Removal requires an ID-mapped index")
+        self._check_writable()
+
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+
+        if self.index_type == "hnsw":
+            # HNSW graphs do not support deletion: rebuild from survivors
+            return self._rebuild_without(ids)
+
+        if self.full_ids is not None:
+            keep = ~np.isin(self.full_ids, ids)
+            self.full_ids = self.full_ids[keep]
+            self.full_vectors = self.full_vectors[keep]
+
+        # IVF direct maps only support removal through an IDSelectorArray
+        return self.index.remove_ids(
+            faiss.IDSelectorArray(len(ids), faiss.swig_ptr(ids))
+        )
+
+    @property
+    def id_mapped(self) -> bool:
+        """
+        True when search returns caller-supplied ids (movie_id)
+        rather than row positions.
+        """
+        return (
+            isinstance(self.index, faiss.IndexIDMap)
+            or faiss.try_extract_index_ivf(self.index) is not None
+        )
+
+    @property
+    def compressed(self) -> bool:
+        return self.index_type in COMPRESSED_INDEX_TYPES
+
+    @property
+    def exact_vectors(self) -> bool:
+        """
+        Whether reconstruct() returns the original full-precision vectors.
+        """
+        return not self.compressed or self.full_vectors is not None
+
+    @property
+    def ntotal(self) -> int:
+        return 0 if self.index is None else self.index.ntotal
+
+    # -----------------------------
+    # QUERY-TIME TUNING
+    # -----------------------------
+    def set_search_params(
+        self,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> None:
+        """
+        Trade recall for latency at query time.
+        nprobe applies to IVF indexes, ef_search to HNSW.
+        """
+        if nprobe is not None:
+            self.params["nprobe"] = int(nprobe)
+        if ef_search is not None:
+            self.params["ef_search"] = int(ef_search)
 
-        self.index.add(vectors)
+        self._apply_search_params()
 
     # -----------------------------
     # SAVE / LOAD
     # -----------------------------
     def save(self, path: Path) -> None:
         """
-        Persist FAISS index to disk.
+        Persist FAISS index to disk, with its parameters
+        in a JSON file next to it.
         """
         if self.index is None:
             raise RuntimeError("Index has not been built or loaded")
@@ -64,51 +212,388 @@ class FaissIndex:
         path.parent.mkdir(parents=True, exist_ok=True)
         faiss.write_index(self.index, str(path))
 
+        meta = {"index_type": self.index_type, "dim": self.dim, **self.params}
+        self.params_path(path).write_text(json.dumps(meta, indent=2))
+
+        if self.full_vectors is not None:
+            np.save(self.full_vectors_path(path), np.asarray(self.full_vectors))
+            np.save(self.full_ids_path(path), np.asarray(self.full_ids))
+
     @classmethod
-    def load(cls, path: Path) -> "FaissIndex":
+    def load(
+        cls,
+        path: Path,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mmap: bool = False,
+    ) -> "FaissIndex":
         """
         Load FAISS index from disk and return a FaissIndex instance.
+        Indexes saved without a params file are treated as "flat".
+
+        With mmap=True the vector data is memory-mapped read-only, so
+        processes loading the same file share one page-cache copy.
         """
         if not path.exists():
             raise FileNotFoundError(f"FAISS index not found at {path}")
 
-        index = faiss.read_index(str(path))
-        obj = cls(dim=index.d)
+        params_path = cls.params_path(path)
+        meta = json.loads(params_path.read_text()) if params_path.exists() else {}
+        index_type = meta.pop("index_type", "flat")
+        meta.pop("dim", None)
+
+        if mmap:
+            # IVF inverted lists and flat code arrays use different mmap hooks
+            io_flag = (
+                faiss.IO_FLAG_MMAP
+                if index_type.startswith("ivf")
+                else faiss.IO_FLAG_MMAP_IFC
+            )
+            index = faiss.read_index(str(path), io_flag | faiss.IO_FLAG_READ_ONLY)
+        else:
+            index = faiss.read_index(str(path))
+
+        obj = cls(dim=index.d, index_type=index_type, params=meta)
         obj.index = index
+        obj.read_only = mmap
+        obj.set_search_params(nprobe=nprobe, ef_search=ef_search)
+
+        vectors_path = cls.full_vectors_path(path)
+        if obj.compressed and vectors_path.exists():
+            mmap_mode = "r" if mmap else None
+            obj.full_vectors = np.load(vectors_path, mmap_mode=mmap_mode)
+            obj.full_ids = np.load(cls.full_ids_path(path), mmap_mode=mmap_mode)
+
         return obj
 
+    @staticmethod
+    def params_path(path: Path) -> Path:
+        """
+        movies.index -> movies.params.json
+        """
+        return path.with_suffix(".params.json")
+
+    @staticmethod
+    def full_vectors_path(path: Path) -> Path:
+        """
+        movies.index -> movies.vectors.npy (full-precision rescoring store)
+        """
+        return path.with_suffix(".vectors.npy")
+
+    @staticmethod
+    def full_ids_path(path: Path) -> Path:
+        return path.with_suffix(".vector_ids.npy")
+
     # -----------------------------
     # SEARCH
     # -----------------------------
     def search(
         self,
         query_vector: np.ndarray,
-        top_k: int = 5
+        top_k: int = 5,
+        allowed_ids: Optional[np.ndarray] = None,
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Perform similarity search.
+        :param allowed_ids: restrict results to these ids
         """
-        if self.index is None:
-            raise RuntimeError("Index not loaded or built")
-
         if query_vector.ndim != 1 or query_vector.shape[0] != self.dim:
             raise ValueError(
                 f"Expected query vector of shape ({self.dim},), got {query_vector.shape}"
             )
 
-        query_vector = query_vector.astype(np.float32)
-        faiss.normalize_L2(query_vector.reshape(1, -1))
-
-        scores, indices = self.index.search(
+        scores, indices = self.search_batch(
             query_vector.reshape(1, -1),
-            top_k
+            top_k,
+            allowed_ids=allowed_ids,
         )
 
         return scores[0], indices[0]
 
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 5,
+        allowed_ids: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search many queries in one FAISS call.
+        Shape: (num_queries, dim) -> (num_queries, top_k) scores and indices.
+        :param allowed_ids: restrict results to these ids (FAISS ID selector)
+        """
+        if self.index is None:
+            raise RuntimeError("Index not loaded or built")
+
+        if query_vectors.ndim != 2 or query_vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected query vectors of shape (n, {self.dim}), got {query_vectors.shape}"
+            )
+
+        query_vectors = np.array(query_vectors, dtype=np.float32, order="C")
+        faiss.normalize_L2(query_vectors)
+
+        # Compressed indexes: over-fetch, then rescore at full precision
+        rescore = self.full_vectors is not None and self.params["rescore_factor"] > 1
+        fetch_k = top_k * self.params["rescore_factor"] if rescore else top_k
+
+        if allowed_ids is None:
+            scores, labels = self.index.search(query_vectors, fetch_k)
+        elif self._supports_selector():
+            allowed_ids = np.ascontiguousarray(allowed_ids, dtype=np.int64)
+            selector = faiss.IDSelectorBatch(allowed_ids)
+            scores, labels = self.index.search(
+                query_vectors,
+                fetch_k,
+                params=self._search_params(selector),
+            )
+        else:
+            # PQ / PCA indexes reject ID selectors: post-filter instead
+            scores, labels = self.index.search(query_vectors, fetch_k)
+            labels = np.where(np.isin(labels, allowed_ids), labels, -1)
+
+        if rescore:
+            return self._rescore(query_vectors, labels, top_k)
+        return scores, labels
+
+    def search_subset(
+        self,
+        query_vector: np.ndarray,
+        ids: np.ndarray,
+        top_k: int = 5,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact scan over the given ids only.
+        Used when a filter is so selective that ANN search is wasteful.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0 or top_k <= 0:
+            return np.array([], dtype=np.float32), np.array([], dtype=np.int64)
+
+        query = np.array(query_vector, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+
+        scores = self.reconstruct(ids) @ query[0]
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        order = top[np.argsort(-scores[top])]
+        return scores[order], ids[order]
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Stored (normalized) vectors for the given ids.
+        Exact when a full-precision store is present, otherwise
+        approximate for compressed indexes.
+        """
+        if self.index is None:
+            raise RuntimeError("Index not loaded or built")
+
+        if self.full_vectors is not None:
+            return self._full_vectors_for(ids)
+
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        return self.index.reconstruct_batch(ids)
+
     # -----------------------------
     # INTERNAL HELPERS
     # -----------------------------
+    def _factory_string(self, num_vectors: int) -> str:
+        """
+        FAISS factory string for the configured index type.
+        nlist is capped so that every cluster gets enough training points.
+        """
+        if self.index_type == "flat":
+            return "Flat"
+
+        if self.index_type == "hnsw":
+            return f"HNSW{self.params['hnsw_m']}"
+
+        n_train = min(num_vectors, self.params["train_sample_size"])
+        nlist = max(1, min(self.params["nlist"], n_train // 39))
+        self.params["nlist"] = nlist
+
+        if self.index_type == "ivf_flat":
+            return f"IVF{nlist},Flat"
+
+        # Compressed types, with optional PCA in front
+        pca_dim = self.params["pca_dim"]
+        code_dim = pca_dim or self.dim
+        if pca_dim and not 0 < pca_dim < self.dim:
+            raise ValueError(f"pca_dim={pca_dim} must be in (0, {self.dim})")
+        prefix = f"PCA{pca_dim}," if pca_dim else ""
+
+        if self.index_type == "sq8":
+            return f"{prefix}SQ8"
+
+        pq_m, pq_nbits = self.params["pq_m"], self.params["pq_nbits"]
+        if code_dim % pq_m != 0:
+            raise ValueError(f"pq_m={pq_m} must divide code dim {code_dim}")
+        if n_train < 2 ** pq_nbits:
+            raise ValueError(
+                f"PQ with {pq_nbits} bits needs at least "
+                f"{2 ** pq_nbits} training vectors, got {n_train}"
+            )
+
+        if self.index_type == "pq":
+            return f"{prefix}PQ{pq_m}x{pq_nbits}"
+        return f"{prefix}IVF{nlist},PQ{pq_m}x{pq_nbits}"
+
+    def _create_index(self, num_vectors: int) -> faiss.Index:
+        index = faiss.index_factory(
+            self.dim,
+            self._factory_string(num_vectors),
+            faiss.METRIC_INNER_PRODUCT,
+        )
+
+        if self.index_type == "hnsw":
+            index.hnsw.efConstruction = self.params["ef_construction"]
+
+        # IVF indexes store ids natively (with a direct map for
+        # reconstruction); the others need an id map
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        else:
+            index = faiss.IndexIDMap2(index)
+
+        return index
+
+    def _supports_selector(self) -> bool:
+        base = self._base_index()
+        return not isinstance(base, (faiss.IndexPreTransform, faiss.IndexPQ))
+
+    def _search_params(self, selector: faiss.IDSelector) -> faiss.SearchParameters:
+        if faiss.try_extract_index_ivf(self.index) is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.params["nprobe"])
+
+        if isinstance(self._base_index(), faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.params["ef_search"])
+
+        return faiss.SearchParameters(sel=selector)
+
+    def _add_with_ids(self, vectors: np.ndarray, ids: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Add vectors and return the ids they were stored under.
+        """
+        if not self.id_mapped:
+            if ids is not None:
+                raise RuntimeError("Index is not ID-mapped, rebuild it to use ids")
+            start = self.index.ntotal
+            self.index.add(vectors)
+            return np.arange(start, start + len(vectors))
+
+        if ids is None:
+            ids = np.arange(self.index.ntotal, self.index.ntotal + len(vectors))
+
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+
+        self.index.add_with_ids(vectors, ids)
+        return ids
+
+    def _reset_full_vectors(self) -> None:
+        if self.compressed:
+            self.full_ids = np.array([], dtype=np.int64)
+            self.full_vectors = np.empty((0, self.dim), dtype=np.float32)
+        else:
+            self.full_ids = self.full_vectors = None
+
+    def _store_full_vectors(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        if self.full_ids is None:
+            return
+
+        all_ids = np.concatenate([self.full_ids, ids])
+        all_vectors = np.concatenate([self.full_vectors, vectors])
+        order = np.argsort(all_ids, kind="stable")
+        self.full_ids = all_ids[order]
+        self.full_vectors = all_vectors[order]
+
+    def _full_vectors_for(self, ids: np.ndarray) -> np.ndarray:
+        rows = np.searchsorted(self.full_ids, ids)
+        rows = np.clip(rows, 0, len(self.full_ids) - 1)
+        if not np.array_equal(self.full_ids[rows], ids):
+            raise KeyError("Some ids are missing from the full-precision store")
+        return np.asarray(self.full_vectors[rows])
+
+    def _rescore(
+        self,
+        query_vectors: np.ndarray,
+        labels: np.ndarray,
+        top_k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Re-rank compressed-index candidates by exact inner product.
+        """
+        num_queries = len(query_vectors)
+        scores = np.full((num_queries, top_k), -np.finfo(np.float32).max, dtype=np.float32)
+        ids = np.full((num_queries, top_k), -1, dtype=np.int64)
+
+        for i in range(num_queries):
+            candidates = labels[i][labels[i] >= 0]
+            if len(candidates) == 0:
+                continue
+
+            exact = self._full_vectors_for(candidates) @ query_vectors[i]
+            order = np.argsort(-exact)[:top_k]
+            scores[i, :len(order)] = exact[order]
+            ids[i, :len(order)] = candidates[order]
+
+        return scores, ids
+
+    def _rebuild_without(self, ids: np.ndarray) -> int:
+        all_ids = faiss.vector_to_array(self.index.id_map)
+        keep = ~np.isin(all_ids, ids)
+        removed = int((~keep).sum())
+        if removed == 0:
+            return 0
+
+        vectors = self._base_index().reconstruct_n(0, self.index.ntotal)[keep]
+        self.index = self._create_index(len(vectors))
+        self._apply_search_params()
+        self.index.add_with_ids(vectors, all_ids[keep])
+        return removed
+
+    def _base_index(self) -> faiss.Index:
+        """
+        The underlying index, without the id map wrapper.
+        """
+        if isinstance(self.index, faiss.IndexIDMap):
+            return faiss.downcast_index(self.index.index)
+        return faiss.downcast_index(self.index)
+
+    def _train(self, vectors: np.ndarray) -> None:
+        """
+        Train IVF / PQ quantizers on a random sample of the vectors.
+        """
+        if self.index.is_trained:
+            return
+
+        sample_size = min(len(vectors), self.params["train_sample_size"])
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+        self.index.train(sample)
+
+    def _apply_search_params(self) -> None:
+        if self.index is None:
+            return
+
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            ivf.nprobe = self.params["nprobe"]
+
+        hnsw = self._base_index()
+        if isinstance(hnsw, faiss.IndexHNSW):
+            hnsw.hnsw.efSearch = self.params["ef_search"]
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("Index was loaded memory-mapped and is read-only")
+
     def _validate_vectors(self, vectors: np.ndarray) -> None:
         if vectors.ndim != 2:
             raise ValueError(f"Vectors must be 2D, got {vectors.shape}")
@@ -1,16 +1,51 @@
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import os
+import shutil
 import numpy as np
 import pandas as pd
 
 from src.data.movie_repository import MovieRepository
 from src.models.embedding_model import EmbeddingModel
+from src.index.corpus_encoder import CorpusEncoder
+from src.index.embedding_store import EmbeddingStore
 from src.index.faiss_index import FaissIndex
-from src.config.settings import FAISS_INDEX_PATH
+from src.index.neighbour_table import NeighbourTable, build_neighbour_table, save_neighbour_table
+from src.index.sharded_faiss_index import ShardedFaissIndex, open_index
+from src.config.settings import (
+    CORPUS_EMBED_MIN_ROWS,
+    CORPUS_EMBED_WORKERS,
+    EMBEDDING_STORE_COMPACT_RATIO,
+    EMBEDDING_STORE_PATH,
+    FAISS_INDEX_PATH,
+    FAISS_INDEX_TYPE,
+    FAISS_NUM_SHARDS,
+    FAISS_LOAD_MMAP,
+    FAISS_SNAPSHOT_DIR,
+    FAISS_SNAPSHOTS_TO_KEEP,
+    NEIGHBOUR_TABLE_K,
+)
+
+
+MANIFEST_NAME = "manifest.json"
+CURRENT_POINTER_NAME = "CURRENT"
 
 
 class IndexBuilder:
     """
     Builds and persists a FAISS index for movies.
+
+    The index is keyed by movie_id. Alongside it we keep the indexed
+    movie_ids (mapping file) and a hash of each movie's embedding_text,
+    so a rebuild only embeds rows that are new or changed.
+
+    Every build is written to its own versioned snapshot directory with
+    a manifest, and the CURRENT pointer file is switched atomically.
+    Indexes written before snapshots existed are still read from
+    index_path's directory.
     """
 
     def __init__(
@@ -18,85 +53,450 @@ class IndexBuilder:
         repository: MovieRepository,
         embedding_model: EmbeddingModel,
         index_path: Path = FAISS_INDEX_PATH,
+        index_type: str = FAISS_INDEX_TYPE,
+        index_params: Optional[Dict[str, Any]] = None,
+        snapshot_dir: Path = FAISS_SNAPSHOT_DIR,
+        num_shards: int = FAISS_NUM_SHARDS,
+        store_path: Path = EMBEDDING_STORE_PATH,
+        embed_workers: int = CORPUS_EMBED_WORKERS,
     ):
         self.repository = repository
         self.embedding_model = embedding_model
         self.index_path = index_path
-        self.mapping_path = index_path.with_suffix(".mapping.npy")
+        self.index_type = index_type
+        self.index_params = index_params
+        self.snapshot_dir = snapshot_dir
+        self.num_shards = num_shards
+        self.store_path = store_path
+        self.embed_workers = embed_workers
+        self._store: Optional[EmbeddingStore] = None
 
-    def build(self) -> None:
+    # -----------------------------
+    # BUILD
+    # -----------------------------
+    def build(self, full_rebuild: bool = False) -> Optional[str]:
         """
-        Build or append to FAISS index from movie embeddings.
+        Sync the FAISS index with the catalog into a new snapshot.
+        New movies are added, edited movies are upserted and
+        deleted movies are removed; unchanged rows are not re-embedded.
+        Vectors already in the embedding store are reused, so only
+        new or edited texts go through the model.
+        Returns the new snapshot version, or None if nothing changed.
+        :param full_rebuild: ignore the current index and build a fresh one
         """
         df = self.repository.get_all_movies()
 
         if "embedding_text" not in df.columns:
             raise ValueError("embedding_text column missing")
 
-        if df.empty:
+        catalog_version = self._catalog_version(df)
+        df = df.drop_duplicates(subset=["movie_id"], keep="last")
+        movie_ids = df["movie_id"].to_numpy(dtype=np.int64)
+        hashes = self._hash_texts(df["embedding_text"])
+
+        if full_rebuild:
+            index = None
+            indexed_ids, indexed_hashes = np.array([], dtype=np.int64), np.array([], dtype="S16")
+        else:
+            index, indexed_ids, indexed_hashes = self._load_existing()
+
+        # Diff catalog against what is already indexed
+        previous = dict(zip(indexed_ids.tolist(), indexed_hashes.tolist()))
+        is_new = np.array([mid not in previous for mid in movie_ids.tolist()], dtype=bool)
+        is_changed = np.array(
+            [previous.get(mid, h) != h for mid, h in zip(movie_ids.tolist(), hashes.tolist())],
+            dtype=bool,
+        )
+        deleted_ids = np.setdiff1d(indexed_ids, movie_ids)
+
+        to_embed = is_new | is_changed
+        current = self.load_manifest()
+        if (
+            not to_embed.any()
+            and len(deleted_ids) == 0
+            and current is not None
+            and current.get("catalog_version") == catalog_version
+        ):
+            print("FAISS index is up to date, nothing to rebuild")
+            return None
+
+        print(
+            f"Index sync: {int(is_new.sum())} new, {int(is_changed.sum())} changed, "
+            f"{len(deleted_ids)} deleted"
+        )
+
+        store = self.store
+        if index is not None:
+            self._backfill_store(index, movie_ids[~to_embed], hashes[~to_embed])
+
+        # Drop deleted and stale vectors before upserting
+        if index is not None:
+            index.remove(np.concatenate([deleted_ids, movie_ids[is_changed]]))
+        # Diffed against the store itself: a full rebuild has no index
+        # to diff against, and the store must still drop departed movies
+        store.delete(np.setdiff1d(store.ids(), movie_ids))
+
+        # 👉 IMPORTANT: Only embed rows that are not in the store yet
+        if to_embed.any():
+            missing = to_embed & ~store.lookup(movie_ids, hashes)
+            if missing.any():
+                texts = df.loc[missing, "embedding_text"].fillna("").astype(str).tolist()
+                store.append(movie_ids[missing], self._embed_corpus(texts), hashes[missing])
+            print(f"Embedded {int(missing.sum())} texts, reused {int((to_embed & ~missing).sum())}")
+
+            vectors = store.get(movie_ids[to_embed])
+            if index is None:
+                index = self._new_index(dim=vectors.shape[1])
+                index.build(vectors, ids=movie_ids[to_embed])
+            else:
+                index.add(vectors, ids=movie_ids[to_embed])
+
+        if store.stale_ratio() > EMBEDDING_STORE_COMPACT_RATIO:
+            print(f"Compacting embedding store ({store.stale_ratio():.0%} stale records)")
+            store.compact()
+
+        if index is None:
+            print("Catalog is empty, no index to write")
+            return None
+
+        return self._write_snapshot(index, movie_ids, hashes, catalog_version)
+
+    def rebuild(self, index_type: Optional[str] = None) -> Optional[str]:
+        """
+        Build a fresh index (optionally of another type) from the
+        embedding store. The model only runs for rows missing from it.
+        """
+        if index_type is not None:
+            self.index_type = index_type
+        return self.build(full_rebuild=True)
+
+    def _embed_corpus(self, texts: list[str]) -> np.ndarray:
+        """
+        Large jobs go to the parallel, resumable CorpusEncoder. Small
+        ones run in-process but bypass the query embedding cache.
+        """
+        if self.embed_workers > 1 and len(texts) >= CORPUS_EMBED_MIN_ROWS:
+            encoder = CorpusEncoder(self.embedding_model.model_name, num_workers=self.embed_workers)
+            return encoder.encode(texts)
+        return self.embedding_model.encode_uncached(
+            [EmbeddingModel.normalize_text(text) for text in texts],
+            show_progress_bar=True,
+            cache=False,
+        )
+
+    @property
+    def store(self) -> EmbeddingStore:
+        if self._store is None:
+            try:
+                self._store = EmbeddingStore(self.store_path, self.embedding_model.model_name)
+            except ValueError as e:
+                print(f"{e}, starting a new embedding store")
+                self.store_path.unlink()
+                self._store = EmbeddingStore(self.store_path, self.embedding_model.model_name)
+        return self._store
+
+    def _backfill_store(
+        self,
+        index: Union[FaissIndex, ShardedFaissIndex],
+        movie_ids: np.ndarray,
+        hashes: np.ndarray,
+    ) -> None:
+        """
+        Copy vectors of indexes built before the store existed.
+        """
+        missing = ~self.store.lookup(movie_ids, hashes)
+        if not index.exact_vectors or not missing.any():
             return
+        print(f"Copying {int(missing.sum())} vectors from the index into the embedding store")
+        self.store.append(movie_ids[missing], index.reconstruct(movie_ids[missing]), hashes[missing])
 
-        # 👉 IMPORTANT: Only embed rows we are about to add
-        texts = df["embedding_text"].tolist()
-        vectors = self.embedding_model.embed_texts(texts)
+    def _new_index(self, dim: int) -> Union[FaissIndex, ShardedFaissIndex]:
+        if self.num_shards > 1:
+            return ShardedFaissIndex(
+                dim=dim,
+                num_shards=self.num_shards,
+                index_type=self.index_type,
+                params=self.index_params,
+            )
+        return FaissIndex(dim=dim, index_type=self.index_type, params=self.index_params)
 
-        # Load or create index
-        if self.index_path.exists():
-            index = FaissIndex.load(self.index_path)
-        else:
-            index = FaissIndex(dim=vectors.shape[1])
+    def _write_snapshot(
+        self,
+        index: Union[FaissIndex, ShardedFaissIndex],
+        movie_ids: np.ndarray,
+        hashes: np.ndarray,
+        catalog_version: str,
+    ) -> str:
+        """
+        Write index, mapping and manifest to a temp directory, rename it
+        into place and then switch the CURRENT pointer.
+        """
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at:%Y%m%dT%H%M%S%f}-{catalog_version[:8]}"
 
-        # Append vectors (THIS is the real add)
-        index.add(vectors)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.snapshot_dir / f".tmp-{version}"
+        tmp_dir.mkdir()
 
         # Save index first
-        index.save(self.index_path)
+        index.save(self._index_path(tmp_dir))
 
-        # Append mapping AFTER index.add()
-        self._save_mapping(df)
+        # Mapping + hashes AFTER the index
+        self._save_mapping(tmp_dir, movie_ids, hashes)
 
         # Safety check
-        self._validate_index_vs_mapping(index)
+        self._validate_index_vs_mapping(tmp_dir, index)
+
+        # Item-item neighbours for "more like this"
+        if NEIGHBOUR_TABLE_K > 0:
+            save_neighbour_table(tmp_dir, *build_neighbour_table(index, movie_ids))
+
+        manifest = {
+            "version": version,
+            "created_at": created_at.isoformat(),
+            "embedding_model": self.embedding_model.model_name,
+            "dim": index.dim,
+            "index_type": index.index_type,
+            "row_count": int(index.ntotal),
+            "num_shards": getattr(index, "num_shards", 1),
+            "catalog_version": catalog_version,
+            "files": {
+                path.name: self._file_checksum(path)
+                for path in sorted(tmp_dir.iterdir())
+            },
+        }
+        (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+        snapshot = self.snapshot_dir / version
+        os.rename(tmp_dir, snapshot)
+        self._set_current(version)
+        self._prune_snapshots()
+
+        print(f"Wrote index snapshot {version} ({manifest['row_count']} movies)")
+        return version
 
-    def _save_mapping(self, df: pd.DataFrame) -> None:
+    def _load_existing(
+        self,
+    ) -> tuple[Optional[Union[FaissIndex, ShardedFaissIndex]], np.ndarray, np.ndarray]:
         """
-        Append FAISS index → movie_id mapping.
+        Load the current index state. Legacy (row-position) indexes,
+        indexes without content hashes and indexes built with another
+        embedding model trigger a full rebuild.
         """
-        new_movie_ids = df["movie_id"].to_numpy()
+        empty = np.array([], dtype=np.int64), np.array([], dtype="S16")
+        directory = self.current_dir()
 
-        self.mapping_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path = self._index_path(directory)
+        if not (
+            (index_path.exists() or ShardedFaissIndex.shards_meta_path(index_path).exists())
+            and self._mapping_path(directory).exists()
+            and self._hashes_path(directory).exists()
+        ):
+            return None, *empty
 
-        if self.mapping_path.exists():
-            existing_movie_ids = np.load(self.mapping_path)
-            combined_movie_ids = np.concatenate(
-                [existing_movie_ids, new_movie_ids]
-            )
-        else:
-            combined_movie_ids = new_movie_ids
+        manifest = self.load_manifest()
+        if manifest and manifest["embedding_model"] != self.embedding_model.model_name:
+            print("Existing FAISS index was built with another model, rebuilding")
+            return None, *empty
+
+        if manifest and manifest.get("index_type", self.index_type) != self.index_type:
+            print(f"Index type changed to {self.index_type}, rebuilding")
+            return None, *empty
+
+        index = open_index(index_path)
+        if getattr(index, "num_shards", 1) != self.num_shards:
+            print("Shard count changed, rebuilding")
+            return None, *empty
 
-        np.save(self.mapping_path, combined_movie_ids)
+        if not index.id_mapped:
+            print("Existing FAISS index is not keyed by movie_id, rebuilding")
+            return None, *empty
 
-    def _validate_index_vs_mapping(self, index: FaissIndex) -> None:
+        return (
+            index,
+            np.load(self._mapping_path(directory)),
+            np.load(self._hashes_path(directory)),
+        )
+
+    @staticmethod
+    def _hash_texts(texts: pd.Series) -> np.ndarray:
+        """
+        128-bit content hash of each embedding_text.
+        """
+        return np.array(
+            [
+                hashlib.blake2b(str(text).encode("utf-8"), digest_size=16).digest()
+                for text in texts.fillna("")
+            ],
+            dtype="S16",
+        )
+
+    @staticmethod
+    def _catalog_version(df: pd.DataFrame) -> str:
+        """
+        Hash of the full catalog contents (all columns).
+        """
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _file_checksum(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _save_mapping(
+        self,
+        directory: Path,
+        movie_ids: np.ndarray,
+        hashes: np.ndarray,
+    ) -> None:
+        """
+        Save the indexed movie_ids and their content hashes.
+        """
+        np.save(self._mapping_path(directory), movie_ids)
+        np.save(self._hashes_path(directory), hashes)
+
+    def _validate_index_vs_mapping(
+        self,
+        directory: Path,
+        index: Union[FaissIndex, ShardedFaissIndex],
+    ) -> None:
         """
         Ensure FAISS index and mapping stay aligned.
         """
-        movie_ids = np.load(self.mapping_path)
-        if index.index.ntotal != len(movie_ids):
+        movie_ids = np.load(self._mapping_path(directory))
+        if index.ntotal != len(movie_ids):
             raise RuntimeError(
-                f"FAISS index size ({index.index.ntotal}) "
+                f"FAISS index size ({index.ntotal}) "
                 f"!= mapping size ({len(movie_ids)})"
             )
 
-    def load_index(self) -> tuple[FaissIndex, np.ndarray]:
+    # -----------------------------
+    # SNAPSHOTS
+    # -----------------------------
+    def current_version(self) -> Optional[str]:
+        """
+        Version named by the CURRENT pointer, or None for legacy layouts.
+        """
+        pointer = self.snapshot_dir / CURRENT_POINTER_NAME
+        if not pointer.exists():
+            return None
+        return pointer.read_text().strip() or None
+
+    def current_dir(self) -> Path:
+        """
+        Directory holding the index files currently being served.
+        """
+        version = self.current_version()
+        if version is None:
+            return self.index_path.parent
+        return self.snapshot_dir / version
+
+    def load_manifest(self, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        version = version or self.current_version()
+        if version is None:
+            return None
+
+        path = self.snapshot_dir / version / MANIFEST_NAME
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def verify_snapshot(self, version: str) -> None:
         """
-        Load FAISS index and movie_id mapping.
+        Check file checksums against the manifest.
         """
-        index = FaissIndex.load(self.index_path)
+        manifest = self.load_manifest(version)
+        if manifest is None:
+            raise FileNotFoundError(f"No manifest for snapshot {version}")
 
-        if not self.mapping_path.exists():
+        directory = self.snapshot_dir / version
+        for name, checksum in manifest["files"].items():
+            if self._file_checksum(directory / name) != checksum:
+                raise RuntimeError(f"Checksum mismatch for {name} in snapshot {version}")
+
+    def _set_current(self, version: str) -> None:
+        pointer = self.snapshot_dir / CURRENT_POINTER_NAME
+        tmp = pointer.with_name(f".{CURRENT_POINTER_NAME}.tmp")
+        tmp.write_text(version)
+        os.replace(tmp, pointer)
+
+    def _prune_snapshots(self) -> None:
+        """
+        Keep the newest FAISS_SNAPSHOTS_TO_KEEP snapshots.
+        """
+        current = self.current_version()
+        snapshots = sorted(
+            path for path in self.snapshot_dir.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+        for path in snapshots[:-FAISS_SNAPSHOTS_TO_KEEP]:
+            if path.name != current:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _index_path(self, directory: Path) -> Path:
+        return directory / self.index_path.name
+
+    def _mapping_path(self, directory: Path) -> Path:
+        return self._index_path(directory).with_suffix(".mapping.npy")
+
+    def _hashes_path(self, directory: Path) -> Path:
+        return self._index_path(directory).with_suffix(".hashes.npy")
+
+    # -----------------------------
+    # LOAD
+    # -----------------------------
+    def load_index(
+        self,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mmap: bool = FAISS_LOAD_MMAP,
+        version: Optional[str] = None,
+    ) -> tuple[Union[FaissIndex, ShardedFaissIndex], np.ndarray]:
+        """
+        Load FAISS index and movie_id mapping for serving.
+        nprobe / ef_search override the persisted query-time parameters.
+        With mmap=True both files are memory-mapped read-only.
+        :param version: snapshot to load; defaults to CURRENT
+        """
+        manifest = self.load_manifest(version)
+        if manifest and manifest["embedding_model"] != self.embedding_model.model_name:
+            raise RuntimeError(
+                f"Index snapshot {manifest['version']} was built with "
+                f"{manifest['embedding_model']}, not {self.embedding_model.model_name}"
+            )
+
+        directory = self.snapshot_dir / version if version else self.current_dir()
+        index = open_index(
+            self._index_path(directory),
+            nprobe=nprobe,
+            ef_search=ef_search,
+            mmap=mmap,
+        )
+
+        mapping_path = self._mapping_path(directory)
+        if not mapping_path.exists():
             raise FileNotFoundError(
-                f"Mapping file not found at {self.mapping_path}"
+                f"Mapping file not found at {mapping_path}"
             )
 
-        movie_ids = np.load(self.mapping_path)
+        movie_ids = np.load(mapping_path, mmap_mode="r" if mmap else None)
         return index, movie_ids
+
+    def load_neighbours(
+        self,
+        mmap: bool = FAISS_LOAD_MMAP,
+        version: Optional[str] = None,
+    ) -> Optional[NeighbourTable]:
+        """
+        Load the snapshot's neighbour table, or None if it has none.
+        """
+        directory = self.snapshot_dir / version if version else self.current_dir()
+        if not NeighbourTable.exists(directory):
+            return None
+
+        movie_ids = np.load(self._mapping_path(directory), mmap_mode="r" if mmap else None)
+        return NeighbourTable.load(directory, movie_ids, mmap=mmap)
@@ -0,0 +1,112 @@
+from typing import Iterable, Optional, Tuple
+import re
+import numpy as np
+import pandas as pd
+
+from src.config.settings import LEXICAL_FIELDS, BM25_K1, BM25_B
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+STOP_WORDS = frozenset(
+    """
+    a about after all an and any are as at be but by for from has have i
+    in into is it its like me movie movies my of on one or so some something
+    that the their them there this to want was what when where which while
+    who with without would you
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOP_WORDS]
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 inverted index over the catalog's title/cast/keywords.
+
+    Postings are stored CSR-style: the documents (catalog rows) of term t
+    are postings[indptr[t]:indptr[t + 1]], with their precomputed BM25
+    term weights alongside, so a query is one gather + np.bincount.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        fields: Iterable[str] = LEXICAL_FIELDS,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ):
+        self.num_docs = len(df)
+        fields = [field for field in fields if field in df.columns]
+
+        text = pd.Series("", index=pd.RangeIndex(self.num_docs))
+        for field in fields:
+            text = text + " " + df[field].astype(object).fillna("").astype(str).to_numpy()
+
+        tokens = text.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+        tokens = tokens[~tokens.isin(STOP_WORDS)]
+        docs = tokens.index.to_numpy(dtype=np.int64)
+        terms, vocabulary = pd.factorize(tokens)
+
+        # One posting per (term, doc) pair, term-major
+        pairs, tf = np.unique(terms.astype(np.int64) * self.num_docs + docs, return_counts=True)
+        posting_terms, posting_docs = np.divmod(pairs, self.num_docs)
+
+        doc_len = np.bincount(docs, minlength=self.num_docs).astype(np.float32)
+        avg_len = max(float(doc_len.mean()), 1.0)
+        doc_freq = np.bincount(posting_terms, minlength=len(vocabulary))
+        idf = np.log1p((self.num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        norm = k1 * (1 - b + b * doc_len[posting_docs] / avg_len)
+        self.weights = (idf[posting_terms] * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+        self.postings = posting_docs.astype(np.int32)
+        self.indptr = np.concatenate([[0], np.cumsum(doc_freq)]).astype(np.int64)
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def scores(self, query: str) -> Optional[np.ndarray]:
+        """
+        BM25 score of every document, or None if no query term is indexed.
+        """
+        term_ids = {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        if not term_ids:
+            return None
+
+        positions = np.concatenate([
+            np.arange(self.indptr[t], self.indptr[t + 1]) for t in term_ids
+        ])
+        return np.bincount(
+            self.postings[positions],
+            weights=self.weights[positions],
+            minlength=self.num_docs,
+        )
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best-scoring documents (rows, scores), best first, restricted to
+        mask when given. Documents matching no query term are never returned.
+        """
+        scores = self.scores(query)
+        if scores is None:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+
+        matched = np.flatnonzero(scores > 0)
+        k = min(top_k, len(matched))
+        if k == 0:
+            return matched, scores[matched].astype(np.float32)
+
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top].astype(np.float32)
@@ -0,0 +1,101 @@
+from pathlib import Path
+from typing import Tuple, Union
+import time
+import numpy as np
+import pandas as pd
+
+from src.index.faiss_index import FaissIndex
+from src.index.sharded_faiss_index import ShardedFaissIndex
+from src.config.settings import NEIGHBOUR_TABLE_K, NEIGHBOUR_BATCH_SIZE
+
+
+NEIGHBOURS_FILE = "movies.neighbours.npy"
+NEIGHBOUR_SCORES_FILE = "movies.neighbour_scores.npy"
+
+
+def build_neighbour_table(
+    index: Union[FaissIndex, ShardedFaissIndex],
+    movie_ids: np.ndarray,
+    k: int = NEIGHBOUR_TABLE_K,
+    batch_size: int = NEIGHBOUR_BATCH_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k neighbours of every indexed movie via a batched self-search.
+
+    Returns (neighbours, scores) of shape (len(movie_ids), k): int32 row
+    positions into movie_ids (-1 = none) and float16 cosine scores.
+    """
+    start = time.perf_counter()
+    movie_ids = np.asarray(movie_ids, dtype=np.int64)
+    row_of = pd.Index(movie_ids)
+    labels = movie_ids if index.id_mapped else np.arange(len(movie_ids))
+
+    neighbours = np.full((len(movie_ids), k), -1, dtype=np.int32)
+    scores = np.zeros((len(movie_ids), k), dtype=np.float16)
+
+    for begin in range(0, len(movie_ids), batch_size):
+        batch = slice(begin, begin + batch_size)
+        batch_scores, batch_labels = index.search_batch(index.reconstruct(labels[batch]), k + 1)
+
+        if index.id_mapped:
+            batch_rows = row_of.get_indexer(batch_labels.ravel()).reshape(batch_labels.shape)
+        else:
+            batch_rows = batch_labels
+        batch_rows = np.where(batch_labels >= 0, batch_rows, -1)
+
+        # Drop each movie itself, keep the first k others
+        own = np.arange(begin, begin + len(batch_rows))[:, None]
+        order = np.argsort(batch_rows == own, axis=1, kind="stable")[:, :k]
+        neighbours[batch] = np.take_along_axis(batch_rows, order, axis=1)
+        scores[batch] = np.take_along_axis(batch_scores, order, axis=1)
+
+    print(f"Built {k}-NN table for {len(movie_ids)} movies in {time.perf_counter() - start:.1f}s")
+    return neighbours, scores
+
+
+def save_neighbour_table(directory: Path, neighbours: np.ndarray, scores: np.ndarray) -> None:
+    np.save(directory / NEIGHBOURS_FILE, neighbours)
+    np.save(directory / NEIGHBOUR_SCORES_FILE, scores)
+
+
+class NeighbourTable:
+    """
+    Serving view of a precomputed neighbour table (memory-mapped).
+    """
+
+    def __init__(self, movie_ids: np.ndarray, neighbours: np.ndarray, scores: np.ndarray):
+        self.movie_ids = movie_ids
+        self.neighbours = neighbours
+        self.scores = scores
+        self._row_of = pd.Index(np.asarray(movie_ids, dtype=np.int64))
+
+    @classmethod
+    def load(cls, directory: Path, movie_ids: np.ndarray, mmap: bool = True) -> "NeighbourTable":
+        mmap_mode = "r" if mmap else None
+        return cls(
+            movie_ids,
+            np.load(directory / NEIGHBOURS_FILE, mmap_mode=mmap_mode),
+            np.load(directory / NEIGHBOUR_SCORES_FILE, mmap_mode=mmap_mode),
+        )
+
+    @staticmethod
+    def exists(directory: Path) -> bool:
+        return (directory / NEIGHBOURS_FILE).exists() and (directory / NEIGHBOUR_SCORES_FILE).exists()
+
+    @property
+    def k(self) -> int:
+        return self.neighbours.shape[1]
+
+    def similar(self, movie_id: int, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (movie_ids, scores) of the nearest neighbours of movie_id.
+        Raises KeyError if the movie is not in the table.
+        """
+        row = self._row_of.get_indexer([movie_id])[0]
+        if row < 0:
+            raise KeyError(f"movie_id {movie_id} not in neighbour table")
+
+        rows = np.asarray(self.neighbours[row, :top_k])
+        scores = np.asarray(self.scores[row, :top_k], dtype=np.float32)
+        found = rows >= 0
+        return np.asarray(self.movie_ids)[rows[found]], scores[found]
@@ -0,0 +1,110 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import faiss
+
+from src.index.faiss_index import FaissIndex
+
+
+# (index_type, params) pairs compared by default
+DEFAULT_CONFIGS: List[Tuple[str, Dict[str, Any]]] = [
+    ("sq8", {}),
+    ("sq8", {"pca_dim": 256}),
+    ("pq", {"pq_m": 96}),
+    ("pq", {"pq_m": 64}),
+    ("ivf_pq", {"pq_m": 64}),
+    ("ivf_pq", {"pq_m": 32, "pca_dim": 256}),
+]
+
+
+def recall_report(
+    vectors: np.ndarray,
+    configs: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+    num_queries: int = 200,
+    top_k: int = 10,
+) -> pd.DataFrame:
+    """
+    Compare compressed index types against exact search.
+
+    Queries are sampled from the catalog itself. For every config we
+    report recall@k of the compressed first pass, recall@k after exact
+    rescoring, bytes per vector of the compressed index, and latency.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    ids = np.arange(len(vectors))
+
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)]
+
+    exact = FaissIndex(dim=vectors.shape[1], index_type="flat")
+    exact.build(vectors.copy(), ids=ids)
+    _, truth = exact.search_batch(queries, top_k)
+
+    rows = []
+    for index_type, params in configs or DEFAULT_CONFIGS:
+        index = FaissIndex(dim=vectors.shape[1], index_type=index_type, params=params)
+
+        start = time.perf_counter()
+        try:
+            index.build(vectors.copy(), ids=ids)
+        except ValueError as e:
+            print(f"Skipping {index_type} {params}: {e}")
+            continue
+        build_s = time.perf_counter() - start
+
+        # First pass only: disable rescoring
+        rescore_factor = index.params["rescore_factor"]
+        index.params["rescore_factor"] = 1
+        _, raw = index.search_batch(queries, top_k)
+
+        index.params["rescore_factor"] = rescore_factor
+        start = time.perf_counter()
+        _, rescored = index.search_batch(queries, top_k)
+        query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        rows.append({
+            "index_type": index_type,
+            "params": params,
+            "bytes_per_vector": round(
+                faiss.serialize_index(index.index).nbytes / len(vectors), 1
+            ),
+            f"recall@{top_k}": _recall(raw, truth),
+            f"recall@{top_k}_rescored": _recall(rescored, truth),
+            "query_ms": round(query_ms, 3),
+            "build_s": round(build_s, 2),
+        })
+
+    return pd.DataFrame(rows)
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(f, t)) for f, t in zip(found, truth))
+    return round(hits / truth.size, 4)
+
+
+def main():
+    from src.data.movie_repository import MovieRepository
+    from src.models.embedding_model import EmbeddingModel
+    from src.index.index_builder import IndexBuilder
+
+    repo = MovieRepository()
+    repo.load()
+
+    # Vectors come from the embedding store (or the existing index),
+    # no re-embedding needed
+    builder = IndexBuilder(repo, EmbeddingModel())
+    if len(builder.store):
+        _, vectors = builder.store.items()
+    else:
+        index, mapping = builder.load_index(mmap=False)
+        labels = mapping if index.id_mapped else np.arange(len(mapping))
+        vectors = index.reconstruct(labels)
+
+    print(f"Full precision: {vectors.shape[1] * 4} bytes per vector\n")
+    print(recall_report(vectors).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
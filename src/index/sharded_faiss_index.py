@@ -0,0 +1,297 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+from pathlib import Path
+import json
+import numpy as np
+import faiss
+
+from src.index.faiss_index import FaissIndex
+from src.config.settings import FAISS_INDEX_TYPE
+
+
+class ShardedFaissIndex:
+    """
+    Catalog partitioned across N FaissIndex shards (by movie_id % N).
+
+    Searches fan out to all shards on a thread pool (FAISS releases the
+    GIL while scanning) and the per-shard top-k lists are merged into one
+    global ranking. Exposes the same interface as FaissIndex.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        num_shards: int,
+        index_type: str = FAISS_INDEX_TYPE,
+        params: Optional[Dict[str, Any]] = None,
+    ):
+        if num_shards < 1:
+            raise ValueError("num_shards must be >= 1")
+
+        self.dim = dim
+        self.num_shards = num_shards
+        self.index_type = index_type
+        self.shards: List[FaissIndex] = [
+            FaissIndex(dim, index_type=index_type, params=params)
+            for _ in range(num_shards)
+        ]
+        # movie_ids held by each shard (its mapping file)
+        self.shard_ids: List[np.ndarray] = [
+            np.array([], dtype=np.int64) for _ in range(num_shards)
+        ]
+        self._pool: ThreadPoolExecutor | None = None
+
+    # -----------------------------
+    # BUILD / ADD / REMOVE
+    # -----------------------------
+    def build(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """
+        Build every shard from scratch. ids are required for routing.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        for shard_no, rows in enumerate(self._route(ids)):
+            if len(rows) == 0:
+                continue
+            self.shards[shard_no].build(vectors[rows], ids=ids[rows])
+            self.shard_ids[shard_no] = ids[rows]
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        if vectors is None or len(vectors) == 0:
+            return
+
+        ids = np.asarray(ids, dtype=np.int64)
+        for shard_no, rows in enumerate(self._route(ids)):
+            if len(rows) == 0:
+                continue
+            self.shards[shard_no].add(vectors[rows], ids=ids[rows])
+            self.shard_ids[shard_no] = np.concatenate([self.shard_ids[shard_no], ids[rows]])
+
+    def remove(self, ids: np.ndarray) -> int:
+        if ids is None or len(ids) == 0:
+            return 0
+
+        ids = np.asarray(ids, dtype=np.int64)
+        removed = 0
+        for shard_no, rows in enumerate(self._route(ids)):
+            if len(rows) == 0 or self.shards[shard_no].index is None:
+                continue
+            removed += self.shards[shard_no].remove(ids[rows])
+            self.shard_ids[shard_no] = self.shard_ids[shard_no][
+                ~np.isin(self.shard_ids[shard_no], ids[rows])
+            ]
+        return removed
+
+    @property
+    def id_mapped(self) -> bool:
+        return True
+
+    @property
+    def ntotal(self) -> int:
+        return sum(shard.ntotal for shard in self.shards)
+
+    @property
+    def exact_vectors(self) -> bool:
+        return all(shard.exact_vectors for shard in self.shards)
+
+    @property
+    def read_only(self) -> bool:
+        return any(shard.read_only for shard in self.shards)
+
+    def set_search_params(
+        self,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> None:
+        for shard in self.shards:
+            shard.set_search_params(nprobe=nprobe, ef_search=ef_search)
+
+    # -----------------------------
+    # SAVE / LOAD
+    # -----------------------------
+    def save(self, path: Path) -> None:
+        """
+        movies.index -> movies.shards.json + movies.shard{i}.index
+        and movies.shard{i}.mapping.npy
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for shard_no, shard in enumerate(self.shards):
+            if shard.index is None:
+                raise RuntimeError(f"Shard {shard_no} is empty, use fewer shards")
+            shard_path = self.shard_path(path, shard_no)
+            shard.save(shard_path)
+            np.save(shard_path.with_suffix(".mapping.npy"), self.shard_ids[shard_no])
+
+        meta = {"num_shards": self.num_shards, "index_type": self.index_type, "dim": self.dim}
+        self.shards_meta_path(path).write_text(json.dumps(meta, indent=2))
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mmap: bool = False,
+    ) -> "ShardedFaissIndex":
+        meta_path = cls.shards_meta_path(path)
+        if not meta_path.exists():
+            raise FileNotFoundError(f"Shard manifest not found at {meta_path}")
+
+        meta = json.loads(meta_path.read_text())
+        obj = cls(dim=meta["dim"], num_shards=meta["num_shards"], index_type=meta["index_type"])
+        for shard_no in range(obj.num_shards):
+            shard_path = cls.shard_path(path, shard_no)
+            obj.shards[shard_no] = FaissIndex.load(
+                shard_path,
+                nprobe=nprobe,
+                ef_search=ef_search,
+                mmap=mmap,
+            )
+            obj.shard_ids[shard_no] = np.load(
+                shard_path.with_suffix(".mapping.npy"),
+                mmap_mode="r" if mmap else None,
+            )
+        return obj
+
+    @staticmethod
+    def shard_path(path: Path, shard_no: int) -> Path:
+        return path.with_suffix(f".shard{shard_no}{path.suffix}")
+
+    @staticmethod
+    def shards_meta_path(path: Path) -> Path:
+        return path.with_suffix(".shards.json")
+
+    # -----------------------------
+    # SEARCH
+    # -----------------------------
+    def search(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 5,
+        allowed_ids: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if query_vector.ndim != 1 or query_vector.shape[0] != self.dim:
+            raise ValueError(
+                f"Expected query vector of shape ({self.dim},), got {query_vector.shape}"
+            )
+
+        scores, indices = self.search_batch(
+            query_vector.reshape(1, -1),
+            top_k,
+            allowed_ids=allowed_ids,
+        )
+        return scores[0], indices[0]
+
+    def search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 5,
+        allowed_ids: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fan out to every shard in parallel and merge the top-k lists.
+        """
+        if allowed_ids is not None:
+            allowed_ids = np.asarray(allowed_ids, dtype=np.int64)
+            shard_allowed = [allowed_ids[rows] for rows in self._route(allowed_ids)]
+        else:
+            shard_allowed = [None] * self.num_shards
+
+        def search_shard(shard_no: int) -> Tuple[np.ndarray, np.ndarray]:
+            allowed = shard_allowed[shard_no]
+            if self.shards[shard_no].index is None or (
+                allowed is not None and len(allowed) == 0
+            ):
+                return self._empty(len(query_vectors), top_k)
+            return self.shards[shard_no].search_batch(
+                query_vectors,
+                top_k,
+                allowed_ids=allowed,
+            )
+
+        results = list(self._executor().map(search_shard, range(self.num_shards)))
+
+        # Merge: (n, shards * k) -> global top_k per query
+        scores = np.concatenate([r[0] for r in results], axis=1)
+        labels = np.concatenate([r[1] for r in results], axis=1)
+        scores = np.where(labels >= 0, scores, -np.finfo(np.float32).max)
+
+        k = min(top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        return (
+            np.take_along_axis(scores, top, axis=1),
+            np.take_along_axis(labels, top, axis=1),
+        )
+
+    def search_subset(
+        self,
+        query_vector: np.ndarray,
+        ids: np.ndarray,
+        top_k: int = 5,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact scan over the given ids only.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0 or top_k <= 0:
+            return np.array([], dtype=np.float32), np.array([], dtype=np.int64)
+
+        query = np.array(query_vector, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+
+        scores = self.reconstruct(ids) @ query[0]
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        order = top[np.argsort(-scores[top])]
+        return scores[order], ids[order]
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.empty((len(ids), self.dim), dtype=np.float32)
+        for shard_no, rows in enumerate(self._route(ids)):
+            if len(rows):
+                vectors[rows] = self.shards[shard_no].reconstruct(ids[rows])
+        return vectors
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    def _route(self, ids: np.ndarray) -> List[np.ndarray]:
+        """
+        Row positions of ids belonging to each shard.
+        """
+        shard_of = np.asarray(ids, dtype=np.int64) % self.num_shards
+        return [np.flatnonzero(shard_of == shard_no) for shard_no in range(self.num_shards)]
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.num_shards,
+                thread_name_prefix="faiss-shard",
+            )
+        return self._pool
+
+    @staticmethod
+    def _empty(num_queries: int, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            np.full((num_queries, top_k), -np.finfo(np.float32).max, dtype=np.float32),
+            np.full((num_queries, top_k), -1, dtype=np.int64),
+        )
+
+
+def open_index(
+    path: Path,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    mmap: bool = False,
+) -> Union[FaissIndex, ShardedFaissIndex]:
+    """
+    Load a sharded index if a shard manifest exists, else a single index.
+    """
+    if ShardedFaissIndex.shards_meta_path(path).exists():
+        return ShardedFaissIndex.load(path, nprobe=nprobe, ef_search=ef_search, mmap=mmap)
+    return FaissIndex.load(path, nprobe=nprobe, ef_search=ef_search, mmap=mmap)
@@ -4,6 +4,7 @@ from src.movie import Movie
 from google import genai
 import os
 from google.genai.errors import APIError
+from src.monitoring.metrics import timed
 
 try:
     load_dotenv()
@@ -13,6 +14,7 @@ except Exception as e:
     print(f"Error initializing Gemini client: {e}")
     client = None
 
+@timed("gemini_movie_info")
 def extract_movie_info(text: str):
     if not client:
       print("Gemini client not initialized. Check API key setup.")
@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 from src.mood_genre import MovieGenre
 from google import genai
 import os
+from src.monitoring.metrics import timed
 # from google.genai.errors import APIError
 
 
@@ -15,6 +16,7 @@ except Exception as e:
     print(f"Error initializing Gemini client: {e}")
     client = None
 
+@timed("gemini_mood")
 def give_customized_mood_response(text: str):
     if not client:
       print("Gemini client not initialized. Check API key setup.")
@@ -3,6 +3,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from src.models.reranker_model import ReRankerModel
 from src.conversation.get_useful_info import get_useful_info
+from src.conversation.interpreter import set_title_index
 from src.chatbotservice.chatbot_service import ChatbotService
 
 # ------------------------------------------------
@@ -49,6 +50,8 @@ def main():
     load_dotenv()
     repo = MovieRepository()
     repo.load()
+    # Named movies are resolved from the catalog before any LLM call
+    set_title_index(repo.title_index)
 
 
 
@@ -84,7 +87,8 @@ def main():
         repository=repo,
         embedding_model=embedder,
         faiss_index=faiss_index,
-        index_to_movie_id=mapping
+        index_to_movie_id=mapping,
+        re_ranker=re_ranker,
     )
      
 
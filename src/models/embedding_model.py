@@ -1,24 +1,44 @@
-from typing import List
+from typing import List, Optional
+import unicodedata
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
-from src.config.settings import EMBEDDING_MODEL_NAME, EMBEDDING_DTYPE
+from src.cache.lru_cache import LRUCache
+from src.models.onnx_backend import load_sentence_transformer
+from src.config.settings import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_DTYPE,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL_S,
+)
 
 
 class EmbeddingModel:
     """
     Wrapper around SentenceTransformer for generating embeddings.
     Responsible ONLY for embedding text.
+
+    Embeddings are memoized in an LRU cache keyed on the normalized
+    text and the model name; pass the same cache (or model instance)
+    to share it between the API and IndexBuilder.
     """
 
-    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        cache: Optional[LRUCache] = None,
+    ):
         self.model_name = model_name
         self._model: SentenceTransformer | None = None
+        self.cache = cache if cache is not None else LRUCache(
+            EMBEDDING_CACHE_SIZE,
+            ttl_s=EMBEDDING_CACHE_TTL_S,
+        )
 
     def load(self) -> None:
         """Load the embedding model into memory."""
         if self._model is None:
-            self._model = SentenceTransformer(self.model_name)
+            self._model = load_sentence_transformer(self.model_name)
 
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -27,17 +47,29 @@ class EmbeddingModel:
         if not text or not isinstance(text, str):
             raise ValueError("Text must be a non-empty string")
 
+        text = self.normalize_text(text)
+        key = (self.model_name, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.copy()
+
         self.load()
 
         vector = self._model.encode(
             text,
             convert_to_numpy=True,
             normalize_embeddings=True
-        )
+        ).astype(EMBEDDING_DTYPE)
 
-        return vector.astype(EMBEDDING_DTYPE)
+        self.cache.put(key, vector.copy())
+        return vector
 
-    def embed_texts(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    def embed_texts(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = True,
+    ) -> np.ndarray:
         """
         Embed multiple strings into a 2D array.
         Shape: (num_texts, embedding_dim)
@@ -45,14 +77,55 @@ class EmbeddingModel:
         if not texts or not isinstance(texts, list):
             raise ValueError("Texts must be a non-empty list of strings")
 
+        texts = [self.normalize_text(text) for text in texts]
+        cached = [self.cache.get((self.model_name, text)) for text in texts]
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        if missing:
+            encoded = self.encode_uncached(
+                [texts[i] for i in missing],
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar,
+            )
+            for i, vector in zip(missing, encoded):
+                cached[i] = vector
+
+        return np.stack(cached).astype(EMBEDDING_DTYPE)
+
+    def encode_uncached(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        cache: bool = True,
+    ) -> np.ndarray:
+        """
+        Encode normalized texts without consulting the cache, then
+        store the results in it (unless cache=False, as for corpus
+        embedding, which would only evict query vectors).
+        Repeated texts are encoded once.
+        """
         self.load()
 
-        vectors = self._model.encode(
-            texts,
+        unique_texts = list(dict.fromkeys(texts))
+        encoded = self._model.encode(
+            unique_texts,
             batch_size=batch_size,
             convert_to_numpy=True,
             normalize_embeddings=True,
-            show_progress_bar=True
-        )
+            show_progress_bar=show_progress_bar
+        ).astype(EMBEDDING_DTYPE)
+
+        by_text = dict(zip(unique_texts, encoded))
+        if cache:
+            for text, vector in by_text.items():
+                self.cache.put((self.model_name, text), vector.copy())
 
-        return vectors.astype(EMBEDDING_DTYPE)
+        return np.stack([by_text[text] for text in texts])
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Unicode-normalize and collapse whitespace (cache key and model input).
+        """
+        return " ".join(unicodedata.normalize("NFKC", text).split())
@@ -0,0 +1,178 @@
+from concurrent.futures import Future
+from typing import Any, Dict, List
+import queue
+import threading
+import time
+import numpy as np
+
+from src.models.embedding_model import EmbeddingModel
+from src.monitoring.metrics import EMBED_BATCH_SIZE, EMBED_QUEUE_DELAY_SECONDS
+from src.config.settings import (
+    EMBED_BATCH_MAX_WAIT_MS,
+    EMBED_BATCH_MAX_SIZE,
+    EMBED_BATCH_QUEUE_DEPTH,
+)
+
+
+class EmbeddingQueueFull(RuntimeError):
+    """Raised when the micro-batching queue is at capacity."""
+
+
+class EmbeddingService:
+    """
+    Micro-batching front end for EmbeddingModel.
+
+    Concurrent embed_text calls are queued and a single worker thread
+    encodes them together: a batch is flushed once it holds max_batch
+    texts or the oldest request has waited max_wait_ms. Each caller
+    gets its own row back. Drop-in replacement for EmbeddingModel.
+    """
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        max_wait_ms: float = EMBED_BATCH_MAX_WAIT_MS,
+        max_batch: int = EMBED_BATCH_MAX_SIZE,
+        queue_depth: int = EMBED_BATCH_QUEUE_DEPTH,
+    ):
+        self.model = model
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[tuple[str, float, Future]]" = queue.Queue(maxsize=queue_depth)
+        self._worker: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.max_batch_size = 0
+        self.total_queue_delay_s = 0.0
+        self.max_queue_delay_s = 0.0
+        self.rejected = 0
+
+    @property
+    def model_name(self) -> str:
+        return self.model.model_name
+
+    @property
+    def cache(self):
+        return self.model.cache
+
+    def load(self) -> None:
+        self.model.load()
+
+    # -----------------------------
+    # EMBEDDING
+    # -----------------------------
+    def embed_text(self, text: str) -> np.ndarray:
+        """
+        Embed a single string, batched with concurrent callers.
+        """
+        if not text or not isinstance(text, str):
+            raise ValueError("Text must be a non-empty string")
+
+        # Cache hits never wait for a batch
+        text = self.model.normalize_text(text)
+        cached = self.model.cache.get((self.model_name, text))
+        if cached is not None:
+            return cached.copy()
+
+        self._ensure_worker()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((text, time.perf_counter(), future))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise EmbeddingQueueFull(
+                f"Embedding queue is full ({self._queue.maxsize} pending requests)"
+            ) from None
+
+        return future.result()
+
+    def embed_texts(self, texts: List[str], **kwargs) -> np.ndarray:
+        """
+        Bulk calls are already batched; they go straight to the model.
+        """
+        return self.model.embed_texts(texts, **kwargs)
+
+    def encode_uncached(self, texts: List[str], **kwargs) -> np.ndarray:
+        return self.model.encode_uncached(texts, **kwargs)
+
+    # -----------------------------
+    # METRICS
+    # -----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches = self.batches or 1
+            requests = self.requests or 1
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "avg_batch_size": round(self.requests / batches, 2),
+                "max_batch_size": self.max_batch_size,
+                "avg_queue_delay_ms": round(self.total_queue_delay_s * 1000 / requests, 3),
+                "max_queue_delay_ms": round(self.max_queue_delay_s * 1000, 3),
+                "queue_depth": self._queue.qsize(),
+                "rejected": self.rejected,
+            }
+
+    # -----------------------------
+    # WORKER
+    # -----------------------------
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True,
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0][1] + self.max_wait_s
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._process(batch)
+
+    def _process(self, batch: List[tuple[str, float, Future]]) -> None:
+        started = time.perf_counter()
+        delays = [started - enqueued_at for _, enqueued_at, _ in batch]
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+            self.total_queue_delay_s += sum(delays)
+            self.max_queue_delay_s = max(self.max_queue_delay_s, max(delays))
+
+        EMBED_BATCH_SIZE.observe(len(batch))
+        for delay in delays:
+            EMBED_QUEUE_DELAY_SECONDS.observe(delay)
+
+        try:
+            vectors = self.model.encode_uncached(
+                [text for text, _, _ in batch],
+                batch_size=len(batch),
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), vector in zip(batch, vectors):
+            future.set_result(vector)
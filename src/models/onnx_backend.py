@@ -0,0 +1,171 @@
+"""
+ONNX Runtime backend for the embedder and the cross-encoder.
+
+Models are exported once (optionally with dynamic int8 quantization)
+into ONNX_MODEL_DIR and then loaded through sentence-transformers'
+onnx backend. Whenever the export or onnxruntime is missing we fall
+back to the stock PyTorch model.
+
+Export + parity check:  python -m src.models.onnx_backend
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import os
+import numpy as np
+from sentence_transformers import CrossEncoder, SentenceTransformer
+
+from src.config.settings import (
+    MODEL_BACKEND,
+    ONNX_MODEL_DIR,
+    ONNX_QUANTIZE,
+    ONNX_QUANTIZATION_CONFIG,
+    ONNX_INTRA_OP_THREADS,
+    ONNX_PARITY_MIN_COSINE,
+)
+
+
+def export_dir(model_name: str) -> Path:
+    return ONNX_MODEL_DIR / model_name.replace("/", "__")
+
+
+def onnx_file_name(quantize: bool = ONNX_QUANTIZE) -> str:
+    if quantize:
+        return f"onnx/model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx"
+    return "onnx/model.onnx"
+
+
+def onnx_available(model_name: str, quantize: bool = ONNX_QUANTIZE) -> bool:
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return (export_dir(model_name) / onnx_file_name(quantize)).exists()
+
+
+def _model_kwargs(quantize: bool) -> Dict[str, Any]:
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = ONNX_INTRA_OP_THREADS or (os.cpu_count() or 1)
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    return {
+        "file_name": onnx_file_name(quantize),
+        "provider": "CPUExecutionProvider",
+        "session_options": options,
+    }
+
+
+# -----------------------------
+# LOAD
+# -----------------------------
+def load_sentence_transformer(
+    model_name: str,
+    backend: str = MODEL_BACKEND,
+    quantize: bool = ONNX_QUANTIZE,
+) -> SentenceTransformer:
+    if backend == "onnx":
+        if onnx_available(model_name, quantize):
+            return SentenceTransformer(
+                str(export_dir(model_name)),
+                backend="onnx",
+                model_kwargs=_model_kwargs(quantize),
+            )
+        print(f"No ONNX export for {model_name}, falling back to torch")
+    return SentenceTransformer(model_name)
+
+
+def load_cross_encoder(
+    model_name: str,
+    backend: str = MODEL_BACKEND,
+    quantize: bool = ONNX_QUANTIZE,
+) -> CrossEncoder:
+    if backend == "onnx":
+        if onnx_available(model_name, quantize):
+            return CrossEncoder(
+                str(export_dir(model_name)),
+                backend="onnx",
+                model_kwargs=_model_kwargs(quantize),
+            )
+        print(f"No ONNX export for {model_name}, falling back to torch")
+    return CrossEncoder(model_name)
+
+
+# -----------------------------
+# EXPORT
+# -----------------------------
+def export(model_name: str, cross_encoder: bool = False, quantize: bool = ONNX_QUANTIZE) -> Path:
+    """
+    Export a model to ONNX (and its int8 variant) under ONNX_MODEL_DIR.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    target = export_dir(model_name)
+    model_cls = CrossEncoder if cross_encoder else SentenceTransformer
+
+    # The onnx backend converts the torch checkpoint on first load
+    model = model_cls(model_name, backend="onnx")
+    model.save_pretrained(str(target))
+
+    if quantize:
+        export_dynamic_quantized_onnx_model(
+            model,
+            ONNX_QUANTIZATION_CONFIG,
+            str(target),
+        )
+
+    print(f"Exported {model_name} to {target}")
+    return target
+
+
+def parity_check(
+    model_name: str,
+    texts: List[str],
+    min_cosine: float = ONNX_PARITY_MIN_COSINE,
+    quantize: bool = ONNX_QUANTIZE,
+) -> float:
+    """
+    Minimum cosine similarity between torch fp32 and ONNX embeddings.
+    Raises if it falls below min_cosine.
+    """
+    reference = SentenceTransformer(model_name).encode(
+        texts,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    candidate = load_sentence_transformer(model_name, backend="onnx", quantize=quantize).encode(
+        texts,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+
+    cosine = float(np.min(np.sum(reference * candidate, axis=1)))
+    if cosine < min_cosine:
+        raise RuntimeError(
+            f"ONNX embeddings of {model_name} drift from fp32: "
+            f"min cosine {cosine:.4f} < {min_cosine}"
+        )
+    return cosine
+
+
+def main(sample_size: Optional[int] = 256):
+    from src.data.movie_repository import MovieRepository
+    from src.models.embedding_model import EmbeddingModel
+    from src.models.reranker_model import ReRankerModel
+
+    embedder = EmbeddingModel()
+    reranker = ReRankerModel()
+
+    export(embedder.model_name)
+    export(reranker.model_name, cross_encoder=True)
+
+    repo = MovieRepository()
+    repo.load()
+    texts = repo.get_all_movies()["embedding_text"].dropna().astype(str).head(sample_size).tolist()
+
+    cosine = parity_check(embedder.model_name, texts)
+    print(f"Parity OK: min cosine vs fp32 = {cosine:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,33 @@
 from sentence_transformers import CrossEncoder
 import numpy as np
-from typing import List, Tuple
+from typing import Hashable, List, Optional, Sequence, Tuple
+import time
+
+from src.cache.lru_cache import LRUCache
+from src.models.embedding_model import EmbeddingModel
+from src.models.onnx_backend import load_cross_encoder
+from src.config.settings import RERANKER_MODEL_NAME, RERANK_CACHE_SIZE
 
 class ReRankerModel:
     """
     Wrapper for Cross-Encoder models to re-rank candidates.
+    Scores are memoized in a bounded LRU cache keyed on the model,
+    the caller's content version, the normalized query and the key.
     """
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL_NAME,
+        cache: Optional[LRUCache] = None,
+    ):
         self.model_name = model_name
         self._model: CrossEncoder | None = None
+        self.cache = cache if cache is not None else LRUCache(RERANK_CACHE_SIZE)
+        # Running estimate of seconds per scored pair (for time budgets)
+        self.seconds_per_pair: Optional[float] = None
 
     def load(self) -> None:
         if self._model is None:
-            self._model = CrossEncoder(self.model_name)
+            self._model = load_cross_encoder(self.model_name)
 
     def rank(self, query: str, documents: List[str]) -> np.ndarray:
         """
@@ -25,4 +40,56 @@ class ReRankerModel:
         # Create pairs: [[query, doc1], [query, doc2]...]
         pairs = [[query, doc] for doc in documents]
         scores = self._model.predict(pairs)
-        return scores
\ No newline at end of file
+        return scores
+
+    def rank_cached(
+        self,
+        query: str,
+        keys: Sequence[Hashable],
+        documents: Sequence[str],
+        batch_size: int = 16,
+        deadline: Optional[float] = None,
+        version: Optional[Hashable] = None,
+    ) -> np.ndarray:
+        """
+        Score documents in order, reusing cached (query, key) scores.
+        `version` identifies the document texts behind the keys (e.g. the
+        catalog snapshot), so scores never outlive a document change.
+
+        Uncached pairs are scored batch by batch; once the next batch is
+        expected to end past `deadline` (a time.perf_counter() value) the
+        remaining documents are left unscored (NaN).
+        """
+        query = EmbeddingModel.normalize_text(query)
+        scores = np.full(len(keys), np.nan, dtype=np.float32)
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get((self.model_name, version, query, key))
+            if cached is None:
+                pending.append(i)
+            else:
+                scores[i] = cached
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            if deadline is not None:
+                expected = (self.seconds_per_pair or 0.0) * len(batch)
+                if time.perf_counter() + expected > deadline:
+                    break
+
+            began = time.perf_counter()
+            batch_scores = self.rank(query, [documents[i] for i in batch])
+            self._observe(time.perf_counter() - began, len(batch))
+
+            for i, score in zip(batch, batch_scores):
+                scores[i] = score
+                self.cache.put((self.model_name, version, query, keys[i]), float(score))
+
+        return scores
+
+    def _observe(self, elapsed: float, num_pairs: int) -> None:
+        per_pair = elapsed / num_pairs
+        if self.seconds_per_pair is None:
+            self.seconds_per_pair = per_pair
+        else:
+            self.seconds_per_pair = 0.8 * self.seconds_per_pair + 0.2 * per_pair
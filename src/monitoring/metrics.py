@@ -0,0 +1,252 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+import functools
+import threading
+import time
+
+
+# Seconds; covers sub-millisecond array stages up to multi-second LLM calls
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Registry:
+    """
+    Metrics rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Any) -> Any:
+        with self._lock:
+            self._metrics = [m for m in self._metrics if m.name != metric.name] + [metric]
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels: Any) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram; an observation is one bisect and three adds.
+    """
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels: Any) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    """Context manager observing the elapsed time (cheaper than a generator)."""
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class CallbackMetric(_Metric):
+    """
+    Values read at scrape time from existing stats (cache counters,
+    pool sizes), so the hot path pays nothing extra.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]],
+    ):
+        self.kind = kind
+        self.collect = collect
+        super().__init__(name, documentation, labelnames)
+
+    def samples(self) -> List[str]:
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"Metric {self.name} collection failed: {e}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in values.items()
+            if value is not None
+        ]
+
+
+# -----------------------------
+# APP METRICS
+# -----------------------------
+STAGE_SECONDS = Histogram(
+    "moviebot_stage_seconds",
+    "Latency of one pipeline stage (LLM calls, parsing, embedding, search, ranking, serialization).",
+    ["stage"],
+)
+REQUEST_SECONDS = Histogram(
+    "moviebot_request_seconds",
+    "End-to-end API request latency.",
+    ["endpoint"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "moviebot_requests_in_progress",
+    "API requests currently being handled.",
+    ["endpoint"],
+)
+EMPTY_RESULTS = Counter(
+    "moviebot_empty_results_total",
+    "Requests that returned no recommendations.",
+    ["endpoint"],
+)
+EMBED_BATCH_SIZE = Histogram(
+    "moviebot_embed_batch_size",
+    "Texts encoded per micro-batch.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+EMBED_QUEUE_DELAY_SECONDS = Histogram(
+    "moviebot_embed_queue_delay_seconds",
+    "Time an embedding request waited in the micro-batching queue.",
+)
+
+
+def timed(stage: str) -> Callable:
+    """
+    Decorator recording the wrapped call's duration as a pipeline stage.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrumented(endpoint: str) -> Callable:
+    """
+    Decorator for API handlers: request latency and in-progress gauge.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with REQUESTS_IN_PROGRESS.track_in_progress(endpoint=endpoint):
+                with REQUEST_SECONDS.time(endpoint=endpoint):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+def mmr(
+    relevance: np.ndarray,
+    vectors: np.ndarray,
+    k: int,
+    lambda_: float = 0.7,
+) -> np.ndarray:
+    """
+    Maximal marginal relevance selection.
+
+    Greedily picks k candidates maximizing
+        lambda * relevance - (1 - lambda) * max similarity to the picks so far
+    (vectors must be L2-normalized). Only the k rows of the
+    candidate-candidate similarity matrix that the greedy pass reads
+    are computed, one mat-vec per pick. Returns candidate positions in
+    selection order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    relevance = lambda_ * np.asarray(relevance, dtype=np.float32)
+    max_similarity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = np.empty(k, dtype=np.int64)
+
+    for step in range(k):
+        score = relevance - (1 - lambda_) * max_similarity
+        score[~available] = -np.inf
+        pick = int(np.argmax(score))
+
+        selected[step] = pick
+        available[pick] = False
+        np.maximum(max_similarity, vectors @ vectors[pick], out=max_similarity)
+
+    return selected
@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+import secrets
+import threading
+import numpy as np
+import pandas as pd
+
+from src.cache.lru_cache import LRUCache
+from src.config.settings import (
+    TOP_K_RECOMMENDATIONS,
+    PAGINATION_POOL_SIZE,
+    PAGINATION_MAX_POOLS,
+    PAGINATION_TTL_S,
+)
+
+
+@dataclass
+class CandidatePool:
+    """
+    One conversation's ranked candidates. The pool pins the engine
+    (and so the index snapshot) it was ranked on.
+    """
+    recommender: Any
+    user_profile: Dict[str, Any]
+    ranked: pd.DataFrame
+    faiss_k: int
+    exhausted: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class CandidatePoolStore:
+    """
+    Server-side candidate pools behind opaque "show more" cursors.
+
+    A cursor is "<pool id>.<offset>": the next page is ranked[offset:]
+    of the stored pool, so paging needs no embedding or search. When
+    the pool runs out, the search is widened (faiss_k doubled) with
+    every pooled movie excluded and the new results are appended.
+    Pools expire after PAGINATION_TTL_S.
+    """
+
+    def __init__(
+        self,
+        max_pools: int = PAGINATION_MAX_POOLS,
+        ttl_s: float = PAGINATION_TTL_S,
+        pool_size: int = PAGINATION_POOL_SIZE,
+    ):
+        self.pools = LRUCache(max_pools, ttl_s=ttl_s)
+        self.pool_size = pool_size
+
+    def open(
+        self,
+        recommender: Any,
+        user_profile: Dict[str, Any],
+        page_size: int = TOP_K_RECOMMENDATIONS,
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Rank a pool for the profile; returns the first page and the
+        cursor for the next one.
+        """
+        pool_size = max(self.pool_size, page_size)
+        faiss_k = max(50, pool_size)
+        ranked = recommender.recommend(user_profile, top_k=pool_size, faiss_k=faiss_k)
+
+        pool_id = secrets.token_urlsafe(12)
+        pool = CandidatePool(
+            recommender=recommender,
+            user_profile=user_profile,
+            ranked=ranked.reset_index(drop=True),
+            faiss_k=faiss_k,
+            exhausted=len(ranked) < pool_size,
+        )
+        self.pools.put(pool_id, pool)
+        return self._page(pool_id, pool, 0, page_size)
+
+    def next_page(
+        self,
+        cursor: str,
+        page_size: int = TOP_K_RECOMMENDATIONS,
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Page at the cursor and the cursor after it (None when no
+        candidates are left). Raises KeyError for unknown, expired or
+        out-of-range cursors.
+        """
+        pool_id, offset = self._parse(cursor)
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            raise KeyError(f"Unknown or expired cursor: {cursor}")
+        return self._page(pool_id, pool, offset, page_size)
+
+    def active_count(self) -> int:
+        """
+        Pools still within their TTL (expired ones are dropped first).
+        """
+        self.pools.purge_expired()
+        return len(self.pools)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.pools.stats()
+
+    # -----------------------------
+    # INTERNAL HELPERS
+    # -----------------------------
+    def _page(
+        self,
+        pool_id: str,
+        pool: CandidatePool,
+        offset: int,
+        page_size: int,
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        with pool.lock:
+            # Cursors we hand out never point past the pool; anything
+            # further is forged and would force unbounded widening
+            if offset > len(pool.ranked):
+                raise KeyError(f"Cursor offset {offset} is past the candidate pool")
+
+            # Fetch one row beyond the page to know whether there is a next one
+            while len(pool.ranked) <= offset + page_size and not pool.exhausted:
+                self._widen(pool)
+
+            page = pool.ranked.iloc[offset:offset + page_size].reset_index(drop=True)
+            has_more = len(pool.ranked) > offset + page_size or not pool.exhausted
+
+        cursor = f"{pool_id}.{offset + len(page)}" if len(page) and has_more else None
+        return page, cursor
+
+    def _widen(self, pool: CandidatePool) -> None:
+        """
+        Append the next-best candidates, excluding everything pooled.
+        """
+        pool.faiss_k *= 2
+        more = pool.recommender.recommend_excluding(
+            pool.user_profile,
+            exclude=pool.ranked["movie_id"].to_numpy(dtype=np.int64),
+            top_k=self.pool_size,
+            faiss_k=pool.faiss_k,
+        )
+        if len(more) == 0:
+            pool.exhausted = True
+            return
+        pool.ranked = pd.concat([pool.ranked, more], ignore_index=True)
+
+    @staticmethod
+    def _parse(cursor: str) -> Tuple[str, int]:
+        pool_id, _, offset = cursor.rpartition(".")
+        if not pool_id or not offset.isdigit():
+            raise KeyError(f"Malformed cursor: {cursor}")
+        return pool_id, int(offset)
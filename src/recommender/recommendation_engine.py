@@ -1,14 +1,36 @@
 from typing import List, Dict, Any
+import hashlib
+import time
 import numpy as np
 import pandas as pd
 from typing import Optional
 from src.models.embedding_model import EmbeddingModel
+from src.models.reranker_model import ReRankerModel
 from src.index.faiss_index import FaissIndex
+from src.index.lexical_index import LexicalIndex
+from src.index.neighbour_table import NeighbourTable
+from src.data.catalog import MovieCatalog
 from src.data.movie_repository import MovieRepository
+from src.recommender.diversity import mmr
+from src.recommender.result_cache import RecommendationCache, profile_key
+from src.recommender.scoring import SoftBoostStage
+from src.monitoring.metrics import STAGE_SECONDS, timed
 from src.config.settings import (
     TOP_K_RECOMMENDATIONS,
-    GENRE_BOOST,
-    POPULARITY_BOOST,
+    FILTER_EXACT_SCAN_RATIO,
+    FILTER_POST_FILTER_RATIO,
+    RERANK_ENABLED,
+    RERANK_TOP_N,
+    RERANK_BATCH_SIZE,
+    RERANK_WEIGHT,
+    RECOMMEND_TIME_BUDGET_MS,
+    MMR_ENABLED,
+    MMR_LAMBDA,
+    MMR_POOL_SIZE,
+    HYBRID_ENABLED,
+    LEXICAL_TOP_K,
+    RRF_K,
+    RRF_WEIGHT,
 )
 
 
@@ -24,11 +46,35 @@ class RecommendationEngine:
         embedding_model: EmbeddingModel,
         faiss_index: FaissIndex,
         index_to_movie_id: np.ndarray,
+        re_ranker: Optional[ReRankerModel] = None,
+        mmr_lambda: Optional[float] = MMR_LAMBDA if MMR_ENABLED else None,
+        result_cache: Optional[RecommendationCache] = None,
+        version: Optional[str] = None,
+        neighbours: Optional[NeighbourTable] = None,
+        hybrid: bool = HYBRID_ENABLED,
     ):
         self.repository = repository
         self.embedding_model = embedding_model
         self.index = faiss_index
         self.index_to_movie_id = index_to_movie_id
+        self.re_ranker = re_ranker if RERANK_ENABLED else None
+        self.mmr_lambda = mmr_lambda  # None disables diversity re-ranking
+        self.result_cache = result_cache
+        self.neighbours = neighbours
+        self._rerank_documents: Optional[List[str]] = None
+
+        # Catalog arrays in FAISS mapping order; rows past _num_indexed
+        # are catalog movies missing from the index
+        self.catalog = MovieCatalog(repository.df, order=index_to_movie_id)
+        self._num_indexed = int(np.isin(self.catalog.movie_id, index_to_movie_id).sum())
+        self.soft_boosts = SoftBoostStage(self.catalog)
+        self._first_label: Optional[tuple[np.ndarray, np.ndarray]] = None
+
+        # BM25 over title/cast/keywords, rows aligned with the catalog
+        self.lexical = LexicalIndex(self.catalog.frame) if hybrid else None
+
+        # Index/catalog version that cached results are tied to
+        self.version = version or self._content_version()
 
     def recommend(
         self,
@@ -38,111 +84,550 @@ class RecommendationEngine:
     ) -> pd.DataFrame:
         """
         Generate movie recommendations.
+        Identical profiles are answered from the result cache, if set.
         """
-        query_text = user_profile.get("query_text")
-        # intents = user_profile.get('intent_terms')
-        if not query_text:
-            raise ValueError("query_text is required")
+        if self.result_cache is None:
+            return self._recommend(user_profile, top_k, faiss_k)
 
-        # 1. Embed user query
-        text_to_embed = query_text
-        query_vector = self.embedding_model.embed_text(text_to_embed)
+        return self.result_cache.get_or_compute(
+            profile_key(user_profile, top_k, faiss_k),
+            self.version,
+            lambda: self._recommend(user_profile, top_k, faiss_k),
+        )
 
-        # 2. FAISS retrieval
-        scores, indices = self.index.search(query_vector, top_k=faiss_k)
+    def recommend_excluding(
+        self,
+        user_profile: Dict[str, Any],
+        exclude: np.ndarray,
+        top_k: int = TOP_K_RECOMMENDATIONS,
+        faiss_k: int = 50,
+    ) -> pd.DataFrame:
+        """
+        Next-best recommendations, never returning the movie_ids in
+        exclude (e.g. already shown). Not cached.
+        """
+        return self._recommend(user_profile, top_k, faiss_k, exclude)
 
-        candidate_ids = self.index_to_movie_id[indices]
-        df_candidates = self.repository.df[
-            self.repository.df["movie_id"].isin(candidate_ids)
-        ].copy()
+    def _recommend(
+        self,
+        user_profile: Dict[str, Any],
+        top_k: int,
+        faiss_k: int,
+        exclude: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        deadline = time.perf_counter() + RECOMMEND_TIME_BUDGET_MS / 1000
 
-        # Attach similarity scores
-        score_map = dict(zip(candidate_ids, scores))
-        df_candidates["similarity_score"] = df_candidates["movie_id"].map(score_map)
+        # 1. Embed user query (or reuse the named movie's stored vector)
+        text_to_embed = self._query_text(user_profile)
+        query_vector = self._seed_vector(user_profile)
+        if query_vector is None:
+            with STAGE_SECONDS.time(stage="embed"):
+                query_vector = self.embedding_model.embed_text(text_to_embed)
+        else:
+            exclude = self._with_seed(user_profile, exclude)
 
-        # 3. Hard filters
-        df_candidates = self._apply_hard_filters(
-            df_candidates,
-            user_profile
+        # 2. FAISS retrieval (hard filters pushed into the search)
+        scores, indices = self._filtered_search(
+            query_vector,
+            user_profile,
+            top_k,
+            faiss_k,
+            exclude,
         )
 
-        if df_candidates.empty:
-            return df_candidates
+        # 2b. Lexical retrieval, rank-fused with the dense results
+        fused = None
+        if self.lexical is not None:
+            scores, indices, fused = self._fuse(
+                text_to_embed,
+                query_vector,
+                user_profile,
+                scores,
+                indices,
+                exclude,
+            )
+
+        return self._rank_candidates(user_profile, scores, indices, top_k, deadline, fused)
 
-        # 4. Soft boosts
-        df_candidates["final_score"] = df_candidates["similarity_score"]
-        df_candidates["final_score"] += self._genre_boost(
-            df_candidates,
-            user_profile.get("genres")
+    def similar(self, movie_id: int, top_k: int = TOP_K_RECOMMENDATIONS) -> pd.DataFrame:
+        """
+        "More like this" from the precomputed neighbour table (no model
+        inference). Raises KeyError for unknown movies.
+        """
+        if self.neighbours is None:
+            raise RuntimeError("This index snapshot has no neighbour table")
+
+        movie_ids, scores = self.neighbours.similar(movie_id, top_k)
+        rows = self.catalog.rows_for(movie_ids)
+        known = rows >= 0
+        return self.catalog.to_frame(
+            rows[known],
+            similarity_score=scores[known],
+            final_score=scores[known],
         )
-        df_candidates["final_score"] += self._popularity_boost(df_candidates)
-        df_candidates = df_candidates.drop_duplicates(subset=['movie_id'])
-
-        # 5. Rank & return
-        return (
-            df_candidates
-            .sort_values("final_score", ascending=False)
-            .head(top_k)
-            .reset_index(drop=True)
+
+    def recommend_batch(
+        self,
+        user_profiles: List[Dict[str, Any]],
+        top_k: int = TOP_K_RECOMMENDATIONS,
+        faiss_k: int = 50,
+    ) -> List[pd.DataFrame]:
+        """
+        Generate recommendations for many profiles at once:
+        one embedding pass and one FAISS search for the whole batch.
+        Each profile gets its own reranking time budget, so results
+        match recommend() for the same profile.
+        """
+        if not user_profiles:
+            return []
+
+        # 1. Embed all user queries together
+        texts = [self._query_text(profile) for profile in user_profiles]
+        with STAGE_SECONDS.time(stage="embed_batch"):
+            query_vectors = self.embedding_model.embed_texts(
+                texts,
+                show_progress_bar=False
+            )
+
+        # 2. FAISS retrieval
+        with STAGE_SECONDS.time(stage="faiss_search_batch"):
+            scores, indices = self.index.search_batch(query_vectors, top_k=faiss_k)
+
+        results = []
+        for i, profile in enumerate(user_profiles):
+            deadline = time.perf_counter() + RECOMMEND_TIME_BUDGET_MS / 1000
+
+            # Named movie: query with its stored vector, never return it
+            seed_vector = self._seed_vector(profile)
+            if seed_vector is not None:
+                exclude = self._with_seed(profile)
+                profile_scores, profile_indices = self._filtered_search(
+                    seed_vector,
+                    profile,
+                    top_k,
+                    faiss_k,
+                    exclude,
+                )
+                fused = None
+                if self.lexical is not None:
+                    profile_scores, profile_indices, fused = self._fuse(
+                        texts[i],
+                        seed_vector,
+                        profile,
+                        profile_scores,
+                        profile_indices,
+                        exclude,
+                    )
+                results.append(
+                    self._rank_candidates(
+                        profile,
+                        profile_scores,
+                        profile_indices,
+                        top_k,
+                        deadline,
+                        fused,
+                    )
+                )
+                continue
+
+            profile_scores, profile_indices, fused = scores[i], indices[i], None
+            if self.lexical is not None:
+                profile_scores, profile_indices, fused = self._fuse(
+                    texts[i],
+                    query_vectors[i],
+                    profile,
+                    profile_scores,
+                    profile_indices,
+                )
+            ranked = self._rank_candidates(
+                profile,
+                profile_scores,
+                profile_indices,
+                top_k,
+                deadline,
+                fused,
+            )
+
+            # Narrow filters: redo this profile with filter-aware search
+            if len(ranked) < top_k:
+                profile_scores, profile_indices = self._filtered_search(
+                    query_vectors[i],
+                    profile,
+                    top_k,
+                    faiss_k,
+                )
+                if self.lexical is not None:
+                    profile_scores, profile_indices, fused = self._fuse(
+                        texts[i],
+                        query_vectors[i],
+                        profile,
+                        profile_scores,
+                        profile_indices,
+                    )
+                ranked = self._rank_candidates(
+                    profile,
+                    profile_scores,
+                    profile_indices,
+                    top_k,
+                    deadline,
+                    fused,
+                )
+
+            results.append(ranked)
+
+        return results
+
+    def _content_version(self) -> str:
+        """
+        Fingerprint of the catalog and index mapping.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(pd.util.hash_pandas_object(self.catalog.frame, index=False).to_numpy().tobytes())
+        digest.update(np.ascontiguousarray(self.index_to_movie_id, dtype=np.int64).tobytes())
+        digest.update(str(self.index.ntotal).encode("utf-8"))
+        return digest.hexdigest()
+
+    @timed("faiss_search")
+    def _filtered_search(
+        self,
+        query_vector: np.ndarray,
+        user_profile: Dict[str, Any],
+        top_k: int,
+        faiss_k: int,
+        exclude: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Search only among movies that pass the hard filters.
+
+        Very selective filters are answered by an exact scan of the
+        matching rows. Unselective ones (most movies pass) search the
+        whole index with k scaled up by the pass rate and drop filtered
+        rows afterwards. Otherwise an ID-selector search is run and k
+        is doubled until top_k results survive.
+        """
+        mask = self._allowed_mask(user_profile, exclude)
+        num_allowed = int(np.count_nonzero(mask))
+
+        if num_allowed == 0:
+            return np.array([], dtype=np.float32), np.array([], dtype=np.int64)
+
+        if num_allowed >= FILTER_POST_FILTER_RATIO * self.index.ntotal:
+            result = self._post_filtered_search(query_vector, mask, num_allowed, top_k, faiss_k)
+            if result is not None:
+                return result
+
+        allowed = self._allowed_labels(mask)
+
+        if num_allowed <= max(top_k, FILTER_EXACT_SCAN_RATIO * self.index.ntotal):
+            return self.index.search_subset(query_vector, allowed, top_k=faiss_k)
+
+        needed = min(top_k, num_allowed)
+        k = min(faiss_k, num_allowed)
+        while True:
+            scores, labels = self.index.search(query_vector, top_k=k, allowed_ids=allowed)
+            if (labels >= 0).sum() >= needed:
+                return scores, labels
+
+            # ANN search may miss filtered rows; finish with an exact scan
+            if k >= num_allowed:
+                return self.index.search_subset(query_vector, allowed, top_k=faiss_k)
+
+            k = min(k * 2, num_allowed)
+
+    def _post_filtered_search(
+        self,
+        query_vector: np.ndarray,
+        mask: np.ndarray,
+        num_allowed: int,
+        top_k: int,
+        faiss_k: int,
+    ) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """
+        Unfiltered search whose results are masked afterwards, over-fetching
+        by twice the inverse pass rate. None if fewer than top_k results survive
+        (the caller then falls back to an ID-selector search).
+        """
+        k = min(int(np.ceil(2 * faiss_k * self.index.ntotal / num_allowed)), self.index.ntotal)
+        scores, labels = self.index.search(query_vector, top_k=k)
+        found = labels >= 0
+        scores, labels = scores[found], labels[found]
+
+        rows = self.catalog.rows_for(self._to_movie_ids(labels))
+        keep = rows >= 0
+        keep[keep] = mask[rows[keep]]
+        if keep.sum() < min(top_k, num_allowed):
+            return None
+        return scores[keep][:faiss_k], labels[keep][:faiss_k]
+
+    def _allowed_labels(self, mask: np.ndarray) -> np.ndarray:
+        """
+        Index labels (movie_ids, or row positions for legacy indexes)
+        of the catalog rows in mask.
+        """
+        allowed_ids = self.catalog.movie_id[mask]
+
+        if self.index.id_mapped:
+            return np.sort(allowed_ids)
+        return np.flatnonzero(np.isin(self.index_to_movie_id, allowed_ids))
+
+    def _allowed_mask(
+        self,
+        user_profile: Dict[str, Any],
+        exclude: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Catalog rows that are indexed, pass the hard filters and are not
+        in exclude.
+        """
+        mask = self.catalog.filter_mask(user_profile)
+        mask[self._num_indexed:] = False
+        if exclude is not None and len(exclude):
+            excluded = self.catalog.rows_for(exclude)
+            mask[excluded[excluded >= 0]] = False
+        return mask
+
+    @timed("lexical")
+    def _fuse(
+        self,
+        query_text: str,
+        query_vector: np.ndarray,
+        user_profile: Dict[str, Any],
+        scores: np.ndarray,
+        indices: np.ndarray,
+        exclude: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Reciprocal-rank fusion of the dense results with the BM25 top
+        LEXICAL_TOP_K. Returns (cosine similarity, index label, fused
+        score); the fused score is scaled so a movie ranked first by both
+        retrievers scores 1. Movies only BM25 found get their cosine
+        from the stored index vectors.
+        """
+        lexical_rows, _ = self.lexical.search(
+            query_text,
+            LEXICAL_TOP_K,
+            mask=self._allowed_mask(user_profile, exclude),
         )
 
-    # -----------------------
-    # Hard filters
-    # -----------------------
+        found = indices >= 0
+        scores, indices = scores[found], indices[found]
+        dense_rows = self.catalog.rows_for(self._to_movie_ids(indices))
+        known = dense_rows >= 0
+        dense_rows, scores = dense_rows[known], scores[known]
+        # Legacy mappings may repeat a movie; keep its best rank
+        _, first = np.unique(dense_rows, return_index=True)
+        first = np.sort(first)
+        dense_rows, scores = dense_rows[first], scores[first]
+
+        rows, position = np.unique(np.concatenate([dense_rows, lexical_rows]), return_inverse=True)
+        reciprocal_rank = np.concatenate([
+            1.0 / (RRF_K + 1 + np.arange(len(dense_rows))),
+            1.0 / (RRF_K + 1 + np.arange(len(lexical_rows))),
+        ])
+        fused = np.bincount(position, weights=reciprocal_rank) * (RRF_K + 1) / 2
+
+        labels = self._to_labels(rows)
+        similarity = np.empty(len(rows), dtype=np.float32)
+        is_dense = np.zeros(len(rows), dtype=bool)
+        is_dense[position[:len(dense_rows)]] = True
+        similarity[position[:len(dense_rows)]] = scores
+        if not is_dense.all():
+            vectors = self.index.reconstruct(labels[~is_dense])
+            similarity[~is_dense] = vectors @ np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        return similarity, labels, fused.astype(np.float32)
+
+    def _to_labels(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Index labels of indexed catalog rows (inverse of _to_movie_ids).
+        """
+        movie_ids = self.catalog.movie_id[rows]
+        if self.index.id_mapped:
+            return movie_ids
+
+        if self._first_label is None:
+            self._first_label = np.unique(self.index_to_movie_id, return_index=True)
+        mapped_ids, first = self._first_label
+        return first[np.searchsorted(mapped_ids, movie_ids)]
+
+    def _to_movie_ids(self, labels: np.ndarray) -> np.ndarray:
+        """
+        ID-mapped indexes return movie_ids directly; legacy indexes
+        return row positions into the mapping file.
+        """
+        if self.index.id_mapped:
+            return labels
+        return self.index_to_movie_id[labels]
+
+    def _seed_vector(self, user_profile: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Stored index vector of the movie the user named
+        (similar_movie_id), or None if there is none or it is not indexed.
+        """
+        movie_id = user_profile.get("similar_movie_id")
+        if movie_id is None:
+            return None
 
-    def _apply_hard_filters(
+        row = self.catalog.row_of(movie_id)
+        if row is None or row >= self._num_indexed:
+            return None
+        return self.index.reconstruct(self._to_labels(np.array([row])))[0]
+
+    @staticmethod
+    def _with_seed(
+        user_profile: Dict[str, Any],
+        exclude: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        seed = np.array([user_profile["similar_movie_id"]], dtype=np.int64)
+        if exclude is None:
+            return seed
+        return np.concatenate([np.asarray(exclude, dtype=np.int64), seed])
+
+    def _query_text(self, user_profile: Dict[str, Any]) -> str:
+        query_text = user_profile.get("query_text")
+        # intents = user_profile.get('intent_terms')
+        if not query_text:
+            raise ValueError("query_text is required")
+        return query_text
+
+    def _rank_candidates(
         self,
-        df: pd.DataFrame,
         user_profile: Dict[str, Any],
+        scores: np.ndarray,
+        indices: np.ndarray,
+        top_k: int,
+        deadline: Optional[float] = None,
+        fused: Optional[np.ndarray] = None,
     ) -> pd.DataFrame:
-        languages = user_profile.get("language")
-        runtime = user_profile.get("runtime", {})
+        """
+        Filter, boost and rank one query's FAISS results (cosine scores),
+        with their lexical fused scores when hybrid retrieval is on.
+        Works on catalog arrays; only the top_k rows become a DataFrame.
+        """
+        if fused is None:
+            fused = np.zeros(len(scores), dtype=np.float32)
+
+        # ANN indexes pad with -1 when fewer than k results are found
+        found = indices >= 0
+        scores, indices, fused = scores[found], indices[found], fused[found]
 
-        if languages:
-            df = df[df["language"].isin(languages)]
+        rows = self.catalog.rows_for(self._to_movie_ids(indices))
+        known = rows >= 0
+        rows, labels, fused = rows[known], indices[known], fused[known]
+        similarity = scores[known].astype(np.float32)
+
+        # Legacy mappings may repeat a movie; keep its best score
+        rows, first = np.unique(rows, return_index=True)
+        labels, similarity, fused = labels[first], similarity[first], fused[first]
+
+        # 3. Hard filters
+        with STAGE_SECONDS.time(stage="hard_filters"):
+            keep = self.catalog.filter_mask(user_profile, rows)
+        rows, labels = rows[keep], labels[keep]
+        similarity, fused = similarity[keep], fused[keep]
 
-        if runtime:
-            if runtime.get("max") is not None:
-                df = df[df["runtime"] <= runtime["max"]]
-            if runtime.get("min") is not None:
-                df = df[df["runtime"] >= runtime["min"]]
-            if runtime.get("exact") is not None:
-                df = df[df["runtime"] == runtime["exact"]]
-            
-        if not runtime:
-            df = df[df['runtime'] >= 50]
+        columns = {}
+        if self.lexical is not None:
+            columns["fused_score"] = fused
 
-        return df
+        if len(rows) == 0:
+            return self.catalog.to_frame(
+                rows,
+                similarity_score=similarity,
+                final_score=similarity,
+                **columns,
+            )
+
+        # 4. Soft boosts (and the lexical fusion bonus)
+        with STAGE_SECONDS.time(stage="boosts"):
+            final = similarity + RRF_WEIGHT * fused + self.soft_boosts.score(rows, user_profile)
+
+        # 5. Cross-encoder second stage
+        if self.re_ranker is not None:
+            rerank_score = self._rerank(
+                rows,
+                final,
+                self._query_text(user_profile),
+                deadline,
+            )
+            if rerank_score is not None:
+                final += RERANK_WEIGHT * rerank_score
+                columns["rerank_score"] = rerank_score
+
+        # 6. Rank (optionally diversified) & return
+        if self.mmr_lambda is not None and len(rows) > 1:
+            top = self._diversify(labels, final, top_k)
+        else:
+            k = min(top_k, len(rows))
+            top = np.argpartition(-final, k - 1)[:k]
+            top = top[np.argsort(-final[top], kind="stable")]
+
+        return self.catalog.to_frame(
+            rows[top],
+            similarity_score=similarity[top],
+            final_score=final[top],
+            **{name: values[top] for name, values in columns.items()},
+        )
+
+    @timed("mmr")
+    def _diversify(self, labels: np.ndarray, final: np.ndarray, top_k: int) -> np.ndarray:
+        """
+        MMR over the best MMR_POOL_SIZE candidates using their stored
+        index vectors (no re-embedding).
+        """
+        n = min(MMR_POOL_SIZE, len(final))
+        pool = np.argpartition(-final, n - 1)[:n]
+        vectors = self.index.reconstruct(labels[pool])
+        return pool[mmr(final[pool], vectors, top_k, self.mmr_lambda)]
 
     # -----------------------
-    # Soft boosts
+    # Re-ranking
     # -----------------------
 
-    def _genre_boost(
+    @timed("rerank")
+    def _rerank(
         self,
-        df: pd.DataFrame,
-        preferred_genres: Optional[List[str]],
-    ) -> np.ndarray:
-        if not preferred_genres:
-            return 0.0
+        rows: np.ndarray,
+        final: np.ndarray,
+        query_text: str,
+        deadline: Optional[float],
+    ) -> Optional[np.ndarray]:
+        """
+        Cross-encoder probabilities for the top RERANK_TOP_N candidates.
+        Candidates left unscored (outside the top N, or cut by the time
+        budget) get the lowest score of the batch. None if nothing was
+        scored in time.
+        """
+        n = min(RERANK_TOP_N, len(rows))
+        top = np.argpartition(-final, n - 1)[:n]
+        top = top[np.argsort(-final[top], kind="stable")]
+        documents = self._documents()
 
-        def match(genres: str) -> float:
-            if not isinstance(genres, str):
-                return 0.0
-            movie_genres = set(genres.split(","))
-            return GENRE_BOOST if movie_genres & set(preferred_genres) else 0.0
+        scores = self.re_ranker.rank_cached(
+            query_text,
+            self.catalog.movie_id[rows[top]].tolist(),
+            [documents[row] for row in rows[top]],
+            batch_size=RERANK_BATCH_SIZE,
+            deadline=deadline,
+            version=self.version,
+        )
+        scored = ~np.isnan(scores)
+        if not scored.any():
+            return None
 
-        return df["genres"].apply(match)
+        # ms-marco cross-encoders emit logits
+        probs = 1.0 / (1.0 + np.exp(-scores[scored]))
+        rerank_score = np.full(len(rows), probs.min(), dtype=np.float32)
+        rerank_score[top[scored]] = probs
+        return rerank_score
 
-    def _popularity_boost(self, df: pd.DataFrame) -> np.ndarray:
+    def _documents(self) -> List[str]:
         """
-        Light popularity boost using vote_average.
+        Cross-encoder document text per catalog row, built once per engine.
         """
-        if "vote_average" not in df.columns:
-            return 0.0
-
-        # Normalize to 0–1 range
-        votes = df["vote_average"].fillna(0)
-        norm = (votes - votes.min()) / (votes.max() - votes.min() + 1e-6)
-
-        return norm * POPULARITY_BOOST
+        if self._rerank_documents is None:
+            df = self.catalog.frame
+            text = df["title"].fillna("").astype(str)
+            for column in ("genres", "keywords", "overview"):
+                text = text + ". " + df[column].astype(object).fillna("").astype(str)
+            self._rerank_documents = text.tolist()
+        return self._rerank_documents
@@ -0,0 +1,100 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import pandas as pd
+
+from src.cache.lru_cache import LRUCache
+from src.data.catalog import MovieCatalog
+from src.models.embedding_model import EmbeddingModel
+from src.config.settings import RESULT_CACHE_SIZE, RESULT_CACHE_TTL_S
+
+
+def profile_key(user_profile: Dict[str, Any], top_k: int, faiss_k: int) -> tuple:
+    """
+    Canonical, hashable form of a user profile: normalized query text,
+    sorted genres and languages, runtime bounds and the request sizes.
+    Only differences the engine ignores are normalized away.
+    """
+    runtime = MovieCatalog.runtime_bounds(user_profile.get("runtime"))
+    return (
+        EmbeddingModel.normalize_text(str(user_profile.get("query_text") or "")),
+        tuple(sorted({str(g).strip().lower() for g in user_profile.get("genres") or []})),
+        # Languages match the catalog exactly (case-sensitive), so keep them as given
+        tuple(sorted({str(l) for l in user_profile.get("language") or []})),
+        tuple(sorted((k, v) for k, v in runtime.items() if v is not None)),
+        user_profile.get("similar_movie_id"),
+        top_k,
+        faiss_k,
+    )
+
+
+class RecommendationCache:
+    """
+    LRU/TTL cache of recommendation results with single-flight.
+
+    Entries are tagged with the index/catalog version they were computed
+    on; a new version drops the cached results. Concurrent misses for
+    the same key wait for one computation instead of each running it.
+    The last MAX_RETIRED_VERSIONS swapped-out versions are remembered so
+    requests still finishing on them bypass the cache.
+    """
+
+    MAX_RETIRED_VERSIONS = 16
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE, ttl_s: float = RESULT_CACHE_TTL_S):
+        self.cache = LRUCache(max_size, ttl_s=ttl_s)
+        self.version: Optional[str] = None
+        self._retired: deque[str] = deque(maxlen=self.MAX_RETIRED_VERSIONS)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        version: str,
+        compute: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        with self._lock:
+            retired = version in self._retired
+
+        # Request still running on a swapped-out snapshot: no caching
+        if retired:
+            return compute()
+
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    self._retired.append(self.version)
+                self.cache.clear()
+                self.version = version
+
+            cached = self.cache.get((version, key))
+            if cached is not None:
+                return cached.copy()
+
+            future = self._in_flight.get((version, key))
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[(version, key)] = future
+
+        if not leader:
+            return future.result().copy()
+
+        try:
+            result = compute()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            if self.version == version:
+                self.cache.put((version, key), result)
+            future.set_result(result)
+            return result.copy()
+        finally:
+            with self._lock:
+                self._in_flight.pop((version, key), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "in_flight": len(self._in_flight), "version": self.version}
@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Type
+import importlib
+import numpy as np
+
+from src.data.catalog import MovieCatalog
+from src.config.settings import (
+    SOFT_BOOSTS,
+    RECENCY_HALF_LIFE_YEARS,
+    VOTE_CONFIDENCE_MIN_VOTES,
+)
+
+
+class Boost(ABC):
+    """
+    A soft boost. Per-movie features are precomputed once from the
+    catalog in __init__; __call__ maps candidate rows to values in
+    [0, 1], which the stage multiplies by the configured weight.
+    """
+
+    def __init__(self, catalog: MovieCatalog):
+        self.catalog = catalog
+
+    @abstractmethod
+    def __call__(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        ...
+
+
+BOOSTS: Dict[str, Type[Boost]] = {}
+
+
+def register_boost(name: str) -> Callable[[Type[Boost]], Type[Boost]]:
+    def decorator(cls: Type[Boost]) -> Type[Boost]:
+        BOOSTS[name] = cls
+        return cls
+    return decorator
+
+
+def resolve_boost(name: str) -> Type[Boost]:
+    """
+    Built-in boost name, or "package.module:ClassName" for custom ones.
+    """
+    if name in BOOSTS:
+        return BOOSTS[name]
+    if ":" in name:
+        module_name, attr = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), attr)
+    raise ValueError(f"Unknown soft boost: {name}")
+
+
+class SoftBoostStage:
+    """
+    Adds the weighted sum of all configured boosts to candidate scores.
+    """
+
+    def __init__(self, catalog: MovieCatalog, boosts: Optional[Dict[str, float]] = None):
+        self.boosts: List[tuple[str, float, Boost]] = [
+            (name, weight, resolve_boost(name)(catalog))
+            for name, weight in (SOFT_BOOSTS if boosts is None else boosts).items()
+            if weight
+        ]
+
+    def score(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        total = np.zeros(len(rows), dtype=np.float32)
+        for _, weight, boost in self.boosts:
+            total += weight * boost(rows, user_profile)
+        return total
+
+
+# -----------------------
+# Built-in boosts
+# -----------------------
+
+@register_boost("genre")
+class GenreBoost(Boost):
+    """1 if the movie has any of the preferred genres."""
+
+    def __call__(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        bits = self.catalog.genre_bits(user_profile.get("genres"))
+        if not bits:
+            return np.zeros(len(rows), dtype=np.float32)
+        return ((self.catalog.genre_mask[rows] & bits) != 0).astype(np.float32)
+
+
+@register_boost("popularity")
+class PopularityBoost(Boost):
+    """vote_average min-max normalized over the whole catalog."""
+
+    def __init__(self, catalog: MovieCatalog):
+        super().__init__(catalog)
+        votes = np.nan_to_num(catalog.vote_average)
+        self.prior = ((votes - votes.min()) / (votes.max() - votes.min() + 1e-6)).astype(np.float32)
+
+    def __call__(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        return self.prior[rows]
+
+
+@register_boost("language")
+class LanguageBoost(Boost):
+    """1 if the movie is in one of the requested languages."""
+
+    def __call__(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        languages = user_profile.get("language")
+        if not languages:
+            return np.zeros(len(rows), dtype=np.float32)
+        codes = self.catalog.language_codes(languages)
+        return np.isin(self.catalog.language_code[rows], codes).astype(np.float32)
+
+
+@register_boost("recency")
+class RecencyBoost(Boost):
+    """Halves every RECENCY_HALF_LIFE_YEARS since release."""
+
+    def __init__(self, catalog: MovieCatalog):
+        super().__init__(catalog)
+        age = np.clip(date.today().year - np.nan_to_num(catalog.release_year), 0, None)
+        self.prior = np.exp2(-age / RECENCY_HALF_LIFE_YEARS).astype(np.float32)
+
+    def __call__(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        return self.prior[rows]
+
+
+@register_boost("vote_confidence")
+class VoteConfidenceBoost(Boost):
+    """vote_count / (vote_count + VOTE_CONFIDENCE_MIN_VOTES)."""
+
+    def __init__(self, catalog: MovieCatalog):
+        super().__init__(catalog)
+        counts = np.nan_to_num(catalog.vote_count)
+        self.prior = (counts / (counts + VOTE_CONFIDENCE_MIN_VOTES)).astype(np.float32)
+
+    def __call__(self, rows: np.ndarray, user_profile: Dict[str, Any]) -> np.ndarray:
+        return self.prior[rows]
@@ -0,0 +1,62 @@
+import multiprocessing
+
+import pandas as pd
+
+from src.data.columnar_cache import load_catalog
+
+
+def _catalog(num_movies: int = 2000) -> pd.DataFrame:
+    return pd.DataFrame({
+        "movie_id": range(num_movies),
+        "title": [f"Movie {i}" for i in range(num_movies)],
+        "embedding_text": [f"a story about thing {i}" for i in range(num_movies)],
+        "genres": ["drama" if i % 2 else "comedy" for i in range(num_movies)],
+        "cast": [f"Actor {i % 50}" for i in range(num_movies)],
+        "keywords": ["" if i % 7 else None for i in range(num_movies)],
+        "runtime": [90 + i % 60 for i in range(num_movies)],
+        "language": ["en" if i % 3 else "fa" for i in range(num_movies)],
+        "release_year": [1950 + i % 70 for i in range(num_movies)],
+    })
+
+
+def _load(csv_path, cache_dir, results):
+    try:
+        df = load_catalog(csv_path, cache_dir)
+        results.put(("ok", len(df), int(df["movie_id"].sum())))
+    except Exception as e:
+        results.put(("error", repr(e), None))
+
+
+def test_round_trip(tmp_path):
+    csv_path = tmp_path / "movies.csv"
+    expected = _catalog(100)
+    expected.to_csv(csv_path, index=False)
+
+    df = load_catalog(csv_path, tmp_path / "cache")
+    assert df["title"].tolist() == expected["title"].tolist()
+    assert df["movie_id"].tolist() == expected["movie_id"].tolist()
+    # Second load reads the cache
+    assert load_catalog(csv_path, tmp_path / "cache")["genres"].tolist() == expected["genres"].tolist()
+
+
+def test_concurrent_cold_loads_all_succeed(tmp_path):
+    csv_path = tmp_path / "movies.csv"
+    expected = _catalog()
+    expected.to_csv(csv_path, index=False)
+    cache_dir = tmp_path / "cache"
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=_load, args=(csv_path, cache_dir, results))
+        for _ in range(6)
+    ]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=120) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    assert outcomes == [("ok", len(expected), int(expected["movie_id"].sum()))] * len(workers)
+    # Only the live cache is left behind (no temp directories)
+    assert [p.name for p in cache_dir.iterdir() if p.is_dir()] == ["movies"]
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from src.data.movie_repository import MovieRepository
+
+
+@pytest.fixture
+def repo(tmp_path):
+    csv_path = tmp_path / "movies.csv"
+    pd.DataFrame({
+        "movie_id": [1, 2, 1],
+        "title": ["First cut", "Other", "Second cut"],
+        "embedding_text": ["a", "b", "c"],
+        "genres": ["drama", "comedy", "drama"],
+        "cast": ["", "", ""],
+        "keywords": ["", "", ""],
+        "runtime": [100, 90, 110],
+        "language": ["en", "en", "en"],
+        "release_year": [2000, 2001, 2002],
+    }).to_csv(csv_path, index=False)
+
+    repository = MovieRepository(csv_path, cache_dir=None)
+    repository.load()
+    return repository
+
+
+def test_duplicate_movie_id_returns_first_row(repo):
+    assert repo.get_movie_by_id(1)["title"] == "First cut"
+    assert repo.get_movie_by_id(2)["title"] == "Other"
+
+
+def test_unknown_movie_id_raises(repo):
+    with pytest.raises(ValueError):
+        repo.get_movie_by_id(3)
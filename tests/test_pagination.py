@@ -0,0 +1,61 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.recommender.pagination import CandidatePoolStore
+
+
+class FakeRecommender:
+    """Ranks movie_ids 0..n-1 in order; counts widening searches."""
+
+    def __init__(self, num_movies: int = 100):
+        self.num_movies = num_movies
+        self.widen_calls = 0
+
+    def recommend(self, user_profile, top_k, faiss_k):
+        return self._ranked(np.array([], dtype=np.int64), top_k)
+
+    def recommend_excluding(self, user_profile, exclude, top_k, faiss_k):
+        self.widen_calls += 1
+        return self._ranked(exclude, top_k)
+
+    def _ranked(self, exclude, top_k):
+        ids = np.setdiff1d(np.arange(self.num_movies), exclude)[:top_k]
+        return pd.DataFrame({"movie_id": ids, "final_score": -ids.astype(float)})
+
+
+def test_pages_do_not_repeat_and_end_with_no_cursor():
+    store = CandidatePoolStore(pool_size=20)
+    page, cursor = store.open(FakeRecommender(), {"query_text": "x"}, page_size=10)
+    seen = list(page["movie_id"])
+    while cursor:
+        page, cursor = store.next_page(cursor, page_size=10)
+        seen += list(page["movie_id"])
+
+    assert seen == list(range(100))
+
+
+def test_forged_offset_is_rejected_without_widening():
+    recommender = FakeRecommender(num_movies=10_000)
+    store = CandidatePoolStore(pool_size=20)
+    _, cursor = store.open(recommender, {"query_text": "x"}, page_size=10)
+    pool_id = cursor.rpartition(".")[0]
+
+    with pytest.raises(KeyError):
+        store.next_page(f"{pool_id}.9000000", page_size=10)
+    assert recommender.widen_calls == 0
+
+
+def test_unknown_cursor_is_rejected():
+    with pytest.raises(KeyError):
+        CandidatePoolStore().next_page("missing.10")
+
+
+def test_active_count_ignores_expired_pools():
+    store = CandidatePoolStore(pool_size=20, ttl_s=0.05)
+    store.open(FakeRecommender(), {"query_text": "x"}, page_size=10)
+    assert store.active_count() == 1
+
+    time.sleep(0.1)
+    assert store.active_count() == 0